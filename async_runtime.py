@@ -0,0 +1,342 @@
+"""
+Asyncio Node Runtime
+
+Runs a NodeFramework on an asyncio event loop instead of its mining and
+sync threads. Nothing polls: the node's tasks sleep on events and wake
+up the moment one fires.
+
+    new_tx            new transactions to mine (see notify_new_transactions)
+    peer_tip_changed  a peer announced a tip with more work than ours
+    tip_switched      sync adopted a peer chain
+
+Peers announce their tip after every block they mine or adopt, as one UDP
+datagram to each peer's port (base_port + node_id), so a node syncs
+milliseconds after a peer moves ahead instead of on its next poll. Clients
+that append to a node's inbox file send {"type": "inbox"} to the same port.
+The sync_frequency_seconds timer is kept only as a fallback for lost
+datagrams.
+
+A node also pushes each block it mines to its peers ({"type": "block"}).
+Blocks can arrive late, twice or out of order; the receiver keeps the ones
+whose parent it hasn't seen in its orphan pool and connects them once the
+parent arrives (see Blockchain.receive_block), so a pushed block is
+usually adopted without reading the miner's log at all.
+
+Proof-of-work runs in an executor thread. It is abandoned within
+MINING_CHECK_INTERVAL nonces when the tip switches, the node stops or the
+mining task is cancelled.
+
+The blocking parts (PoW, sync, disk writes) run in the loop's default
+executor and still serialize on the node's chain_lock.
+"""
+
+import asyncio
+import json
+import threading
+
+# Larger messages (blocks with very many transactions) are not pushed;
+# peers still get them through the tip announcement and sync
+MAX_DATAGRAM_BYTES = 60000
+
+# Pushed blocks waiting to be connected; more are dropped
+BLOCK_QUEUE_SIZE = 1000
+
+class UdpTipAnnouncer:
+    """Tip announcements between node processes over UDP on localhost"""
+
+    def __init__(self, config, node_id, host="127.0.0.1"):
+        self.config = config
+        self.node_id = node_id
+        self.host = host
+        self.transport = None
+
+    def _port(self, node_id):
+        return self.config["base_port"] + node_id
+
+    async def start(self, runtime):
+        """Listen for peer announcements on this node's port"""
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(
+            lambda: _AnnouncementProtocol(runtime),
+            local_addr=(self.host, self._port(self.node_id))
+        )
+
+    def announce(self, message):
+        """Send a tip announcement to every peer (fire and forget)"""
+        if self.transport is None:
+            return
+        data = json.dumps(message).encode("utf-8")
+        if len(data) > MAX_DATAGRAM_BYTES:
+            return
+        for peer_id in range(self.config["num_nodes"]):
+            if peer_id != self.node_id:
+                self.transport.sendto(data, (self.host, self._port(peer_id)))
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+
+class _AnnouncementProtocol(asyncio.DatagramProtocol):
+    def __init__(self, runtime):
+        self.runtime = runtime
+
+    def datagram_received(self, data, addr):
+        try:
+            message = json.loads(data)
+        except ValueError:
+            return
+        self.runtime.on_message(message)
+
+class LocalTipAnnouncer:
+    """
+    Tip announcements between runtimes in one process (e.g. with the
+    InMemoryTransport); every runtime sharing `hub` hears the others.
+    """
+
+    def __init__(self, hub, node_id):
+        """
+        Args:
+            hub: Dictionary node_id -> AsyncNodeRuntime, shared by all nodes
+            node_id: This node's id
+        """
+        self.hub = hub
+        self.node_id = node_id
+
+    async def start(self, runtime):
+        self.hub[self.node_id] = runtime
+
+    def announce(self, message):
+        for peer_id, runtime in list(self.hub.items()):
+            if peer_id != self.node_id:
+                runtime.on_message(message)
+
+    def close(self):
+        self.hub.pop(self.node_id, None)
+
+class AsyncNodeRuntime:
+    """
+    Event-driven runtime for one node.
+
+    Usage:
+        runtime = AsyncNodeRuntime(NodeFramework(node_id, config))
+        asyncio.run(runtime.run())
+    """
+
+    def __init__(self, node, announcer=None):
+        """
+        Args:
+            node: NodeFramework to run (not started; its threads stay unused)
+            announcer: How tips are announced to peers (defaults to UDP)
+        """
+        self.node = node
+        self.announcer = announcer or UdpTipAnnouncer(node.config, node.node_id)
+        self.sync_interval = node.config["sync_frequency_seconds"]
+        self.loop = None
+        self.new_tx = None
+        self.peer_tip_changed = None
+        self.tip_switched = None
+        self._inbox = None
+        self._blocks = None
+        self._stop = None
+        # Read by the PoW thread: set to give up the current block
+        self._abort_pow = threading.Event()
+        self._tasks = []
+
+    # Events (loop thread only; use the notify_/on_ methods from elsewhere)
+
+    def _create_events(self):
+        self.new_tx = asyncio.Event()
+        self.peer_tip_changed = asyncio.Event()
+        self.tip_switched = asyncio.Event()
+        self._inbox = asyncio.Event()
+        self._blocks = asyncio.Queue(BLOCK_QUEUE_SIZE)
+        self._stop = asyncio.Event()
+
+    def notify_new_transactions(self):
+        """Wake the miner because new transactions arrived (thread-safe)"""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.new_tx.set)
+
+    def on_message(self, message):
+        """Handle a datagram: a peer's tip or block, or an inbox notification (thread-safe)"""
+        if not isinstance(message, dict):
+            return
+        if message.get("type") == "inbox":
+            if self.loop is not None:
+                self.loop.call_soon_threadsafe(self._inbox.set)
+            return
+        if message.get("type") == "block":
+            if self.loop is not None:
+                self.loop.call_soon_threadsafe(self._queue_block, message)
+            return
+        self.on_peer_tip(message)
+    
+    def _queue_block(self, message):
+        try:
+            self._blocks.put_nowait(message)
+        except asyncio.QueueFull:
+            pass
+
+    def on_peer_tip(self, message):
+        """
+        Handle a peer's tip announcement (thread-safe).
+
+        Only a tip that beats ours by the fork-choice rule triggers a sync.
+        """
+        if self.loop is None:
+            return
+        self.loop.call_soon_threadsafe(self._peer_tip, message)
+
+    def _peer_tip(self, message):
+        snapshot = self.node.blockchain.snapshot
+        try:
+            better = self.node.blockchain.is_better_chain(
+                message["chainwork"], message["hash"], snapshot.chainwork, snapshot.tip.hash)
+        except (KeyError, TypeError):
+            return
+        if better:
+            self.peer_tip_changed.set()
+
+    def _announce_block(self, block):
+        self.announcer.announce({
+            "type": "block",
+            "node_id": self.node.node_id,
+            "block": block.to_dict(),
+        })
+    
+    def _announce(self):
+        snapshot = self.node.blockchain.snapshot
+        self.announcer.announce({
+            "type": "tip",
+            "node_id": self.node.node_id,
+            "height": snapshot.height,
+            "hash": snapshot.tip.hash,
+            "chainwork": snapshot.chainwork,
+        })
+
+    async def _wait_any(self, *events, timeout=None):
+        """Wait until one of the events is set (or the timeout passes)"""
+        waiters = [asyncio.ensure_future(event.wait()) for event in events]
+        try:
+            await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    # Tasks
+
+    async def _mining_task(self):
+        node = self.node
+        loop = self.loop
+        while not self._stop.is_set():
+            # Cleared before looking for work, so a tx arriving meanwhile isn't missed
+            self.new_tx.clear()
+            self.tip_switched.clear()
+            prepared = await loop.run_in_executor(None, node._prepare_block)
+            if prepared is None:
+                # Nothing to mine until new transactions arrive or a reorg unmines some
+                await self._wait_any(self.new_tx, self.tip_switched, self._stop)
+                continue
+            block, snapshot = prepared
+            self._abort_pow.clear()
+            try:
+                solved = await loop.run_in_executor(
+                    None, node._solve_block, block, snapshot, self._abort_pow.is_set)
+            except asyncio.CancelledError:
+                self._abort_pow.set()
+                raise
+            if not solved:
+                continue
+            if await loop.run_in_executor(None, node._commit_block, block, snapshot):
+                # The block first, so the tip that follows is no longer news
+                self._announce_block(block)
+                self._announce()
+
+    async def _sync_task(self):
+        node = self.node
+        while not self._stop.is_set():
+            await self._wait_any(self.peer_tip_changed, self._stop, timeout=self.sync_interval)
+            if self._stop.is_set():
+                return
+            self.peer_tip_changed.clear()
+            if await self.loop.run_in_executor(None, node._trigger_sync):
+                # The miner notices the new tip itself and drops its block
+                self.tip_switched.set()
+                self._announce()
+
+    async def _block_task(self):
+        node = self.node
+        while not self._stop.is_set():
+            message = await self._blocks.get()
+            if await self.loop.run_in_executor(None, node.receive_block, message.get("block"), message.get("node_id")):
+                self.tip_switched.set()
+                self._announce()
+    
+    async def _inbox_task(self):
+        while not self._stop.is_set():
+            await self._wait_any(self._inbox, self._stop, timeout=self.sync_interval)
+            self._inbox.clear()
+            if await self.loop.run_in_executor(None, self.node.read_inbox):
+                self.new_tx.set()
+
+    async def _metrics_task(self):
+        while not self._stop.is_set():
+            await self._wait_any(self._stop, timeout=self.node.config.get("metrics_interval_seconds", 5))
+            await self.loop.run_in_executor(None, self.node.write_metrics)
+
+    # Lifecycle
+
+    async def start(self):
+        """Start the node's tasks on the running loop"""
+        self.loop = asyncio.get_running_loop()
+        self._create_events()
+        node = self.node
+        node.running = True
+        node.stopping = False
+        await self.announcer.start(self)
+
+        # Initial sync, then tell the peers where we are
+        if await self.loop.run_in_executor(None, node._trigger_sync):
+            self.tip_switched.set()
+        self._announce()
+
+        # Next block's body is built ahead on its own thread (node.stop stops it)
+        node.template_builder.start()
+        self._tasks = [
+            asyncio.create_task(self._mining_task()),
+            asyncio.create_task(self._sync_task()),
+            asyncio.create_task(self._block_task()),
+            asyncio.create_task(self._inbox_task()),
+        ]
+        if node.metrics.enabled:
+            self._tasks.append(asyncio.create_task(self._metrics_task()))
+        print(f"Node {node.node_id} started (asyncio)")
+
+    def request_stop(self):
+        """Ask run() to return (thread-safe)"""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._stop.set)
+
+    async def stop(self):
+        """Stop the tasks, abandon PoW and flush the node to disk"""
+        node = self.node
+        node.running = False
+        node.stopping = True
+        self._stop.set()
+        self._abort_pow.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.announcer.close()
+        # Saves the chain and state, shuts down the validation pool
+        await self.loop.run_in_executor(None, node.stop)
+
+    async def run(self):
+        """Run the node until request_stop() is called or the task is cancelled"""
+        await self.start()
+        try:
+            await self._stop.wait()
+        finally:
+            await self.stop()
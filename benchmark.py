@@ -0,0 +1,363 @@
+"""
+Benchmark Suite
+
+This script measures the hot paths of the blockchain so changes to block.py,
+crypto_utils.py or blockchain.py can be checked for speedups/regressions:
+
+- mining: mine_block at increasing difficulty (hashes/sec)
+- hash: raw header hashes/sec of every PoW hash function (HASH_FUNCTIONS)
+- merkle: calculate_merkle_root for growing transaction counts
+- serialization: Block.to_dict/from_dict and save_to_file/load_from_file
+- sync: sync_with_peer_logs against N peers with competing chains
+- calibration: expected block time per difficulty on this machine
+
+Results are written as JSON and can be compared against a stored baseline.
+
+Usage:
+    python benchmark.py [--quick] [--output FILE] [--baseline FILE]
+                        [--threshold 0.2] [--save-baseline] [--only mining,merkle]
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+from block import Block
+from blockchain import Blockchain
+from config import load_config
+from metrics import Metrics
+from transaction import Transaction
+from crypto_utils import calculate_merkle_root, HASH_FUNCTIONS
+
+DEFAULT_OUTPUT = "benchmark_results.json"
+DEFAULT_BASELINE = "benchmark_baseline.json"
+
+FULL_SIZES = {
+    "difficulties": [1, 2, 3, 4, 5, 6],
+    "merkle_sizes": [10, 100, 1000, 10000, 100000],
+    "chain_lengths": [10, 100, 1000, 10000, 100000],
+    "peer_counts": [1, 2, 4, 8],
+    "sync_chain_length": 1000,
+    "hash_seconds": 1.0,
+}
+
+QUICK_SIZES = {
+    "difficulties": [1, 2, 3, 4],
+    "merkle_sizes": [10, 100, 1000, 10000],
+    "chain_lengths": [10, 100, 1000],
+    "peer_counts": [1, 2, 4],
+    "sync_chain_length": 100,
+    "hash_seconds": 0.3,
+}
+
+def _best_of(fn, repeat):
+    """Run fn repeat times and return the fastest wall-clock time in seconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def _repeat_for(size):
+    """Fewer repetitions for bigger inputs so the suite stays quick"""
+    if size <= 1000:
+        return 5
+    if size <= 10000:
+        return 3
+    return 1
+
+def make_transactions(count, offset=0):
+    """Build unsigned dummy transactions"""
+    return [
+        Transaction(f"sender_{i % 20}", f"receiver_{(i + 1) % 20}", i % 100 + 1, f"tx_{offset + i:06d}")
+        for i in range(count)
+    ]
+
+def make_chain(blockchain, length, txs_per_block=10, difficulty=0, tx_offset=0):
+    """Extend a blockchain to the given length with filler blocks"""
+    while len(blockchain.chain) < length:
+        txs = make_transactions(txs_per_block, offset=tx_offset + len(blockchain.chain) * txs_per_block)
+        blockchain.mine_block(txs, difficulty)
+    return blockchain
+
+def bench_mining(sizes):
+    """mine_block at each difficulty: hashes/sec and seconds per block"""
+    results = {}
+    for difficulty in sizes["difficulties"]:
+        blockchain = Blockchain()
+        # Enough blocks to average out the luck at low difficulty
+        blocks = max(1, 64 // (16 ** max(difficulty - 2, 0)))
+        hashes = 0
+        start = time.perf_counter()
+        for _ in range(blocks):
+            block = blockchain.mine_block(make_transactions(10), difficulty)
+            hashes += block.nonce + 1
+        elapsed = time.perf_counter() - start
+        results[f"mining/difficulty_{difficulty}"] = {
+            "seconds": elapsed / hashes,
+            "hashes_per_sec": hashes / elapsed,
+            "seconds_per_block": elapsed / blocks,
+            "blocks": blocks,
+        }
+    return results
+
+def _header_hash_rate(hash_function, duration):
+    """Block header hashes/sec (the PoW inner loop) with one hash function"""
+    block = Block(1, "0" * 64, "0" * 64, 0, int(time.time()), 5, [], bits=0x1d00ffff,
+                  hash_function=hash_function)
+    hashes = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        for _ in range(1000):
+            block.nonce = hashes
+            block.calculate_digest()
+            hashes += 1
+    return hashes / (time.perf_counter() - start)
+
+def bench_hash(sizes):
+    """Header hashes/sec and a 1000-tx merkle root for each hash function"""
+    results = {}
+    txs = make_transactions(1000)
+    for name in HASH_FUNCTIONS:
+        rate = _header_hash_rate(name, sizes["hash_seconds"])
+        results[f"hash/{name}"] = {"seconds": 1 / rate, "hashes_per_sec": rate}
+        merkle = _best_of(lambda: calculate_merkle_root(txs, name), 5)
+        results[f"hash/{name}_merkle_1000"] = {"seconds": merkle, "txs_per_sec": 1000 / merkle}
+    return results
+
+def cheapest_hash_function(results):
+    """Name of the hash function with the most header hashes/sec, if measured"""
+    rates = {name: results[f"hash/{name}"]["hashes_per_sec"] for name in HASH_FUNCTIONS if f"hash/{name}" in results}
+    return max(rates, key=rates.get) if rates else None
+
+def bench_merkle(sizes):
+    """calculate_merkle_root over n transactions"""
+    results = {}
+    for n in sizes["merkle_sizes"]:
+        txs = make_transactions(n)
+        elapsed = _best_of(lambda: calculate_merkle_root(txs), _repeat_for(n))
+        results[f"merkle/txs_{n}"] = {"seconds": elapsed, "txs_per_sec": n / elapsed}
+    return results
+
+def bench_serialization(sizes, workdir):
+    """Block.to_dict/from_dict and save_to_file/load_from_file per chain length"""
+    results = {}
+    blockchain = Blockchain()
+    path = os.path.join(workdir, "bench_chain.json")
+    for length in sizes["chain_lengths"]:
+        make_chain(blockchain, length)
+        chain = blockchain.chain[:length]
+        repeat = _repeat_for(length)
+
+        dicts = [block.to_dict() for block in chain]
+        to_dict = _best_of(lambda: [block.to_dict() for block in chain], repeat)
+        from_dict = _best_of(lambda: [Block.from_dict(d) for d in dicts], repeat)
+
+        snapshot = blockchain.chain
+        blockchain.chain = chain
+        save = _best_of(lambda: blockchain.save_to_file(path), repeat)
+        blockchain.chain = snapshot
+        loader = Blockchain()
+        load = _best_of(lambda: loader.load_from_file(path), repeat)
+
+        results[f"serialization/to_dict_{length}"] = {"seconds": to_dict, "blocks_per_sec": length / to_dict}
+        results[f"serialization/from_dict_{length}"] = {"seconds": from_dict, "blocks_per_sec": length / from_dict}
+        results[f"serialization/save_{length}"] = {"seconds": save, "bytes": os.path.getsize(path)}
+        results[f"serialization/load_{length}"] = {"seconds": load, "blocks_per_sec": length / load}
+    return results
+
+def bench_sync(sizes, workdir):
+    """
+    sync_with_peer_logs against N peers, each holding its own competing
+    chain (same genesis and length, different blocks).
+
+    Claim ranking validates the most promising peer first and skips the
+    ones that can't beat it, so blocks_per_sec counts only the blocks that
+    were actually validated, not peers * length.
+    """
+    results = {}
+    length = sizes["sync_chain_length"]
+    genesis = Blockchain().chain[:1]
+
+    for peers in sizes["peer_counts"]:
+        peer_files = []
+        for i in range(peers):
+            peer = Blockchain()
+            peer.chain = list(genesis)
+            make_chain(peer, length, difficulty=1, tx_offset=(i + 1) * 10 ** 6)
+            path = os.path.join(workdir, f"bench_peer_{i}.json")
+            peer.save_to_file(path)
+            peer_files.append(path)
+
+        # Fresh nodes are built up front so key generation isn't timed
+        nodes = [Blockchain() for _ in range(3)]
+        for node in nodes:
+            node.chain = list(genesis)
+            node.metrics = Metrics()
+        runs = list(nodes)
+        elapsed = _best_of(lambda: nodes.pop().sync_with_peer_logs(peer_files), 3)
+        # Every run does the same work; count it from one of them
+        parsed = runs[0].metrics.get("sync_blocks_parsed_total") or 0
+        validated = runs[0].metrics.get("sync_blocks_validated_total") or 0
+        results[f"sync/peers_{peers}"] = {
+            "seconds": elapsed,
+            "chain_length": length,
+            "blocks_parsed": parsed,
+            "blocks_validated": validated,
+            "blocks_per_sec": validated / elapsed,
+        }
+    return results
+
+def calibrate(config, duration=1.0):
+    """
+    Measure the raw hash rate and turn it into expected block times.
+
+    Expected hashes per block at difficulty d are 16^d (d leading hex zeros).
+    The network estimate assumes every node mines on its own CPU, hashing
+    with the configured hash_function.
+    """
+    hash_function = config.get("hash_function") or "sha256"
+    hash_rate = _header_hash_rate(None if hash_function == "sha256" else hash_function, duration)
+
+    nodes = max(1, min(config["num_nodes"], os.cpu_count() or 1))
+    expected = {}
+    for difficulty in range(1, 9):
+        node_seconds = 16 ** difficulty / hash_rate
+        expected[str(difficulty)] = {
+            "node_block_seconds": node_seconds,
+            "network_block_seconds": node_seconds / nodes,
+        }
+    return {
+        "hashes_per_sec": hash_rate,
+        "hash_function": hash_function,
+        "configured_difficulty": config["difficulty"],
+        "mining_nodes": nodes,
+        "expected_block_time": expected,
+    }
+
+def compare_with_baseline(results, baseline, threshold):
+    """
+    Compare results against a baseline run.
+
+    Every benchmark reports "seconds" (lower is better). A benchmark regresses
+    when it is slower than the baseline by more than the threshold fraction.
+
+    Returns:
+        List of (name, baseline_seconds, current_seconds, ratio) regressions
+    """
+    regressions = []
+    for name, current in sorted(results.items()):
+        previous = baseline.get("results", {}).get(name)
+        if not previous or not previous.get("seconds"):
+            continue
+        ratio = current["seconds"] / previous["seconds"]
+        marker = ""
+        if ratio > 1 + threshold:
+            regressions.append((name, previous["seconds"], current["seconds"], ratio))
+            marker = "  REGRESSION"
+        print(f"  {name:<40} {previous['seconds']:.6g}s -> {current['seconds']:.6g}s ({ratio:.2f}x){marker}")
+    return regressions
+
+def print_calibration(calibration):
+    """Print the difficulty calibration report"""
+    print(f"\nHash rate: {calibration['hashes_per_sec']:,.0f} {calibration['hash_function']} hashes/sec per node")
+    print(f"{'difficulty':>10} {'per node':>14} {'network':>14}  ({calibration['mining_nodes']} mining nodes)")
+    for difficulty, times in calibration["expected_block_time"].items():
+        marker = "  <- config" if int(difficulty) == calibration["configured_difficulty"] else ""
+        print(f"{difficulty:>10} {times['node_block_seconds']:>13.2f}s {times['network_block_seconds']:>13.2f}s{marker}")
+
+def run(args):
+    """Run the selected benchmarks and return the full result document"""
+    config = load_config(args.config)
+    sizes = QUICK_SIZES if args.quick else FULL_SIZES
+    if args.max_difficulty:
+        sizes = dict(sizes, difficulties=list(range(1, args.max_difficulty + 1)))
+    selected = set(args.only.split(",")) if args.only else None
+
+    results = {}
+    workdir = tempfile.mkdtemp(prefix="bench_")
+    try:
+        suites = [
+            ("mining", lambda: bench_mining(sizes)),
+            ("hash", lambda: bench_hash(sizes)),
+            ("merkle", lambda: bench_merkle(sizes)),
+            ("serialization", lambda: bench_serialization(sizes, workdir)),
+            ("sync", lambda: bench_sync(sizes, workdir)),
+        ]
+        for name, suite in suites:
+            if selected and name not in selected:
+                continue
+            print(f"Running {name} benchmarks...")
+            results.update(suite())
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    calibration = calibrate(config)
+    return {
+        "meta": {
+            "timestamp": int(time.time()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "quick": args.quick,
+        },
+        "results": results,
+        "calibration": calibration,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Blockchain benchmark suite")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes for a fast run")
+    parser.add_argument("--only", help="comma separated suites: mining,hash,merkle,serialization,sync")
+    parser.add_argument("--max-difficulty", type=int, help="highest mining difficulty to benchmark")
+    parser.add_argument("--config", default="config.json", help="config file for calibration")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to write JSON results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown fraction before failing")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args()
+
+    report = run(args)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    print_calibration(report["calibration"])
+    cheapest = cheapest_hash_function(report["results"])
+    if cheapest:
+        print("\nHash functions (header hashes/sec):")
+        for name in HASH_FUNCTIONS:
+            marker = "  <- cheapest" if name == cheapest else ""
+            print(f"  {name:<10} {report['results'][f'hash/{name}']['hashes_per_sec']:>14,.0f}{marker}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+    print(f"\nComparing against {args.baseline} (threshold {args.threshold:.0%}):")
+    regressions = compare_with_baseline(report["results"], baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
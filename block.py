@@ -6,9 +6,12 @@ Students implement the TODO sections.
 """
 
 import time
-import hashlib
-from crypto_utils import hash_data
+from crypto_utils import hash_data, hash_digest
 from transaction import Transaction
+from pow_target import bits_to_target, difficulty_to_target
+
+# Field order of the raw (not yet deserialized) transaction tuples
+RAW_TX_FIELDS = ("sender", "receiver", "amount", "tx_id", "signature")
 
 class Block:
     """
@@ -16,11 +19,20 @@ class Block:
     
     A block contains:
     - Header: index, previous_hash, merkle_root, nonce, timestamp, difficulty
+      and, for target-based blocks, bits (the compact 256-bit target)
+      and, for chains not using SHA256, hash_function (see HASH_FUNCTIONS)
     - Body: list of transactions
     - Hash: cryptographic hash of the entire block
+    
+    Blocks read with from_dict keep their transactions as compact tuples and
+    only turn them into Transaction objects the first time .transactions is
+    accessed. Header-only work (linkage, PoW, chainwork, fork choice) never
+    pays for the body.
+    
+    A pruned block (see pruned_copy) has no body at all, only the header.
     """
     
-    def __init__(self, index, previous_hash, merkle_root, nonce, timestamp, difficulty, transactions, hash_value=None):
+    def __init__(self, index, previous_hash, merkle_root, nonce, timestamp, difficulty, transactions, hash_value=None, bits=None, hash_function=None):
         """
         Initialize a block.
         
@@ -30,9 +42,13 @@ class Block:
             merkle_root: Root of transaction merkle tree
             nonce: Proof-of-Work nonce value
             timestamp: Unix timestamp
-            difficulty: PoW difficulty level
+            difficulty: PoW difficulty level (for target-based blocks only
+                        informational, rounded from the target)
             transactions: List of Transaction objects
             hash_value: Pre-calculated hash (if None, will be calculated)
+            bits: Compact target (None for legacy leading-zeros blocks)
+            hash_function: PoW/merkle hash from crypto_utils.HASH_FUNCTIONS
+                           (None for SHA256)
         """
         self.index = index
         self.previous_hash = previous_hash
@@ -40,9 +56,62 @@ class Block:
         self.nonce = nonce
         self.timestamp = timestamp
         self.difficulty = difficulty
+        self.bits = bits
+        self.hash_function = hash_function
         self.transactions = transactions
+        self._raw_transactions = None
         self.hash = hash_value or self.calculate_hash()
     
+    @property
+    def transactions(self):
+        """List of Transaction objects (deserialized on first access)"""
+        if self.pruned:
+            raise ValueError(f"Body of block {self.index} was pruned")
+        if self._transactions is None:
+            self._transactions = [
+                Transaction.from_dict(dict(zip(RAW_TX_FIELDS, tx)))
+                for tx in self._raw_transactions
+            ]
+            self._raw_transactions = None
+        return self._transactions
+    
+    @transactions.setter
+    def transactions(self, transactions):
+        self._transactions = transactions
+        self._raw_transactions = None
+    
+    @property
+    def body_loaded(self):
+        """True once the transactions have been deserialized"""
+        return self._transactions is not None
+    
+    @property
+    def pruned(self):
+        """True if the body was dropped and only the header is left"""
+        return self._transactions is None and self._raw_transactions is None
+    
+    def pruned_copy(self):
+        """Header-only copy of this block (same hash, no transactions)"""
+        return Block(self.index, self.previous_hash, self.merkle_root, self.nonce,
+                     self.timestamp, self.difficulty, None, hash_value=self.hash, bits=self.bits,
+                     hash_function=self.hash_function)
+    
+    def tx_ids(self):
+        """Transaction IDs of this block, without deserializing the body"""
+        if self.pruned:
+            raise ValueError(f"Body of block {self.index} was pruned")
+        if self.body_loaded:
+            return [tx.tx_id for tx in self._transactions]
+        return [tx[3] for tx in self._raw_transactions]
+    
+    def transfers(self):
+        """(sender, receiver, amount) of every transaction, without deserializing the body"""
+        if self.pruned:
+            raise ValueError(f"Body of block {self.index} was pruned")
+        if self.body_loaded:
+            return [(tx.sender, tx.receiver, tx.amount) for tx in self._transactions]
+        return [tx[:3] for tx in self._raw_transactions]
+    
     def calculate_hash(self):
         """
         Calculate the cryptographic hash of this block.
@@ -51,14 +120,33 @@ class Block:
         - Header fields (index, previous_hash, merkle_root, nonce, timestamp, difficulty)
         - Transactions (or their hashes)
         
-        Uses SHA256 and returns hex string (lowercase).
+        Uses the block's hash function (SHA256 unless hash_function is set)
+        and returns hex string (lowercase).
         
         Returns:
             Block hash as hex string
         """
+        return hash_data(self.header_string(), self.hash_function)
+    
+    def header_string(self):
+        """The header fields the block hash is computed over"""
         total_data =f"{self.index}|{self.previous_hash}|{self.merkle_root}|{self.nonce}|{self.timestamp}|{self.difficulty}"
-        
-        return hash_data(total_data)
+        if self.bits is not None:
+            total_data += f"|{self.bits}"
+        if self.hash_function is not None:
+            total_data += f"|{self.hash_function}"
+        return total_data
+    
+    def calculate_digest(self):
+        """Raw 32-byte digest of the header (calculate_hash is its hex form)"""
+        return hash_digest(self.header_string(), self.hash_function)
+    
+    @property
+    def target(self):
+        """256-bit integer target the hash must not exceed"""
+        if self.bits is not None:
+            return bits_to_target(self.bits)
+        return difficulty_to_target(self.difficulty)
     
     
     def to_dict(self):
@@ -78,9 +166,19 @@ class Block:
             "nonce":self.nonce,
             "timestamp":self.timestamp,
             "difficulty":self.difficulty,
-            "transactions":[tx.to_dict() for tx in self.transactions],
-            "hash":self.hash
         }
+        if self.pruned:
+            dictionary["pruned"] = True
+        elif self.body_loaded:
+            dictionary["transactions"] = [tx.to_dict() for tx in self._transactions]
+        else:
+            # A body nobody looked at is written back as it was read
+            dictionary["transactions"] = [dict(zip(RAW_TX_FIELDS, tx)) for tx in self._raw_transactions]
+        dictionary["hash"] = self.hash
+        if self.bits is not None:
+            dictionary["bits"] = self.bits
+        if self.hash_function is not None:
+            dictionary["hash_function"] = self.hash_function
         return dictionary 
     
     @classmethod
@@ -88,8 +186,8 @@ class Block:
         """
         Deserialize block from dictionary.
         
-        Reconstructs Block object from JSON/log file data.
-        Transactions should also be deserialized.
+        Reconstructs Block object from JSON/log file data. Only the header is
+        decoded here; transactions stay raw until first accessed.
         
         Args:
             block_dict: Dictionary representation of block
@@ -97,20 +195,27 @@ class Block:
         Returns:
             Block object
         """
-        transactions = [
-            Transaction.from_dict(tx)
-            for tx in block_dict["transactions"]
-        ]
-        return cls(
+        block = cls(
             index = block_dict["index"],
             previous_hash = block_dict["previous_hash"],
             merkle_root = block_dict["merkle_root"],
             nonce = block_dict["nonce"],
             timestamp = block_dict["timestamp"],
             difficulty = block_dict["difficulty"],
-            transactions = transactions ,
-            hash_value = block_dict["hash"]
+            transactions = None,
+            hash_value = block_dict["hash"],
+            bits = block_dict.get("bits"),
+            hash_function = block_dict.get("hash_function")
         )
+        if "transactions" not in block_dict:
+            # Pruned block: header only
+            return block
+        # A tuple per transaction is much smaller than a dict or a Transaction
+        block._raw_transactions = [
+            (tx["sender"], tx["receiver"], tx["amount"], tx["tx_id"], tx.get("signature"))
+            for tx in block_dict["transactions"]
+        ]
+        return block
 
         # TODO: Implement deserialization
         # Parse dictionary
@@ -123,19 +228,14 @@ class Block:
         """
         Check if block hash meets the difficulty requirement.
         
-        Difficulty means the hash must start with N leading zeros,
-        where N is the difficulty value.
+        The hash, read as a 256-bit integer, must not exceed the block's
+        target. For legacy blocks the target comes from the difficulty, which
+        is the same as requiring N leading zeros.
         
         Returns:
             True if hash meets difficulty, False otherwise
         """
-        diff_level = self.difficulty 
-        hash_val = self.hash 
-        for i in range (0,diff_level):
-            if hash_val[i] != '0':
-                return False
-        
-        return True
+        return int(self.hash, 16) <= self.target
 
         # TODO: Implement difficulty check
         # Check if hash starts with required number of zeros
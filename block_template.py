@@ -0,0 +1,118 @@
+"""
+Block Templates
+
+This module prepares the body of the next block - selected, signed and
+merkle-rooted transactions - on a background thread, so the miner can
+start hashing the moment it finishes (or abandons) the current block
+instead of signing transactions first.
+
+The body doesn't depend on the parent block, so a template built while the
+current block is being mined stays usable after the tip moves, as long as
+none of its transactions got mined in the meantime.
+"""
+
+import threading
+
+class BlockTemplate:
+    """Body of a block that is ready to be mined"""
+
+    __slots__ = ("transactions", "merkle_root", "tx_ids")
+
+    def __init__(self, transactions, merkle_root):
+        """
+        Args:
+            transactions: Signed Transaction objects
+            merkle_root: Merkle root of the transactions
+        """
+        self.transactions = transactions
+        self.merkle_root = merkle_root
+        self.tx_ids = [tx.tx_id for tx in transactions]
+
+    def is_valid_for(self, snapshot):
+        """True if none of the transactions is mined in the snapshot's chain"""
+        return not any(snapshot.contains_tx(tx_id) for tx_id in self.tx_ids)
+
+class TemplateBuilder:
+    """
+    Background thread that builds one template ahead.
+
+    The miner calls prefetch() when it starts hashing a block, passing the
+    tx ids of that block so the next template doesn't reuse them, and
+    take() when it needs the next body.
+    """
+
+    def __init__(self, build):
+        """
+        Args:
+            build: Callable(exclude_ids) -> BlockTemplate or None, run on the
+                   builder thread
+        """
+        self._build = build
+        self._cond = threading.Condition()
+        self._ready = None
+        self._wanted = None
+        self._building = False
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Start the builder thread"""
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the builder thread"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=1)
+
+    @property
+    def running(self):
+        return self._running
+
+    def prefetch(self, exclude_ids=()):
+        """Ask for the next template, leaving out the given tx ids"""
+        with self._cond:
+            self._ready = None
+            self._wanted = set(exclude_ids)
+            self._cond.notify_all()
+
+    def take(self):
+        """
+        Hand over the prefetched template (waiting if it is still being built).
+
+        Returns:
+            BlockTemplate, or None if nothing was prefetched or there was
+            nothing to put in it
+        """
+        with self._cond:
+            while self._building or (self._wanted is not None and self._running):
+                self._cond.wait()
+            template = self._ready
+            self._ready = None
+            return template
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._running and self._wanted is None:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                exclude = self._wanted
+                self._wanted = None
+                self._building = True
+            try:
+                template = self._build(exclude)
+            except Exception as e:
+                print(f"Template builder error: {e}")
+                template = None
+            with self._cond:
+                self._building = False
+                # A newer request replaces this result
+                if self._wanted is None:
+                    self._ready = template
+                self._cond.notify_all()
@@ -0,0 +1,107 @@
+"""
+Bloom Filters
+
+A Bloom filter remembers a set of keys in a fixed bit array: "not in the
+filter" is always right, "in the filter" is wrong with probability about
+error_rate. Nodes use a RotatingBloomFilter of recently seen tx_ids to drop
+gossiped duplicates before parsing or verifying them again.
+
+The bit positions of a key come from one BLAKE2b digest, split into two
+64-bit halves h1 and h2 and combined as h1 + i * h2 (double hashing).
+"""
+
+import hashlib
+import math
+
+class BloomFilter:
+    """Fixed-size Bloom filter for string (or bytes) keys"""
+
+    def __init__(self, capacity, error_rate=0.0001):
+        """
+        Args:
+            capacity: Keys the filter is sized for
+            error_rate: False-positive rate once capacity keys were added
+        """
+        self.capacity = max(1, int(capacity))
+        self.error_rate = error_rate
+        # Optimal size and hash count for this capacity and error rate
+        self.num_bits = max(8, int(math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / self.capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        if isinstance(key, str):
+            key = key.encode("utf-8")
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        num_bits = self.num_bits
+        return [(h1 + i * h2) % num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, key):
+        bits = self.bits
+        for position in self._positions(key):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def add(self, key):
+        """
+        Add a key.
+
+        Returns:
+            True if the key was (probably) there already
+        """
+        bits = self.bits
+        present = True
+        for position in self._positions(key):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not bits[byte] & mask:
+                present = False
+                bits[byte] |= mask
+        if not present:
+            self.count += 1
+        return present
+
+class RotatingBloomFilter:
+    """
+    Bloom filter of the most recently added keys.
+
+    Keys go into the current generation; once it holds `capacity` keys it
+    becomes the previous generation and a fresh one takes over, so between
+    capacity and 2 * capacity of the latest keys are remembered while
+    memory stays fixed.
+    """
+
+    def __init__(self, capacity, error_rate=0.0001):
+        """
+        Args:
+            capacity: Keys per generation
+            error_rate: False-positive rate of each generation when full
+                        (a lookup checks both, so up to about twice this)
+        """
+        self.capacity = max(1, int(capacity))
+        self.error_rate = error_rate
+        self.current = BloomFilter(self.capacity, error_rate)
+        self.previous = None
+
+    def __contains__(self, key):
+        return key in self.current or (self.previous is not None and key in self.previous)
+
+    def add(self, key):
+        """
+        Add a key.
+
+        Returns:
+            True if the key was (probably) seen recently already
+        """
+        if self.previous is not None and key in self.previous:
+            # Refresh it in the current generation so it outlives the rotation
+            self.current.add(key)
+            return True
+        present = self.current.add(key)
+        if self.current.count >= self.capacity:
+            self.previous = self.current
+            self.current = BloomFilter(self.capacity, self.error_rate)
+        return present
@@ -0,0 +1,39 @@
+"""
+Clocks
+
+Nodes read the time and sleep through a clock object, so the in-process
+harness and tests can run a network on simulated time instead of waiting.
+"""
+
+import time
+
+class SystemClock:
+    """Wall-clock time (the default)"""
+
+    def time(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+class ManualClock:
+    """
+    Simulated time that only moves when told to.
+
+    sleep() advances the clock instead of blocking, so loops written
+    against a clock finish instantly.
+    """
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+SYSTEM_CLOCK = SystemClock()
@@ -8,6 +8,7 @@ It handles reading peer log files and getting blockchain state from other nodes.
 import json
 import os
 from config import get_node_log_file, load_config
+from blockchain import PeerCandidate
 
 def get_peer_log_files(node_id, config):
     """
@@ -83,3 +84,84 @@ def get_peer_addresses(node_id, config):
         if i != node_id:
             addresses.append(f"localhost:{base_port + i}")
     return addresses
+
+class FileTransport:
+    """
+    Nodes exchange chains through their JSON log files (the default).
+    
+    Publishing writes the node's log file; syncing reads every peer's log.
+    """
+    
+    def __init__(self, config):
+        self.config = config
+    
+    def load(self, node_id, blockchain, state=None):
+        """
+        Load a node's own published chain into its blockchain.
+        
+        Args:
+            node_id: Node to load
+            blockchain: Blockchain to load into
+            state: Optional saved state to restore derived state from
+        
+        Returns:
+            True if a chain was loaded, False if the node has none yet
+        """
+        log_file = get_node_log_file(node_id)
+        if not os.path.exists(log_file):
+            return False
+        blockchain.load_from_file(log_file, state)
+        return True
+    
+    def publish(self, node_id, blockchain):
+        """Make a node's current chain visible to its peers"""
+        blockchain.save_to_file(get_node_log_file(node_id))
+    
+    def sync(self, node_id, blockchain):
+        """
+        Sync a node's blockchain with its peers.
+        
+        Returns:
+            True if the node adopted a peer chain
+        """
+        return blockchain.sync_with_peer_logs(get_peer_log_files(node_id, self.config))
+
+class InMemoryTransport:
+    """
+    Nodes in one process exchange chains through a shared dictionary.
+    
+    Publishing stores the node's immutable chain snapshot, so peers read
+    Block objects directly: no files, no JSON, no copies.
+    """
+    
+    def __init__(self, config):
+        self.config = config
+        self.published = {}
+    
+    def load(self, node_id, blockchain, state=None):
+        """Load a node's own published chain (e.g. after a simulated restart)"""
+        snapshot = self.published.get(node_id)
+        if snapshot is None:
+            return False
+        if state is None or not blockchain.restore_state(list(snapshot.chain), state):
+            blockchain.chain = list(snapshot.chain)
+        return True
+    
+    def publish(self, node_id, blockchain):
+        """Make a node's current chain visible to its peers"""
+        self.published[node_id] = blockchain.snapshot
+    
+    def sync(self, node_id, blockchain):
+        """
+        Sync a node's blockchain with every other node's published chain.
+        
+        A snapshot's chainwork and tip serve as the peer's claim, so only
+        the best chain gets validated.
+        """
+        candidates = [
+            PeerCandidate(peer_id, snapshot.tip.hash, snapshot.chainwork, snapshot.tip.hash,
+                          lambda chain=snapshot.chain: chain)
+            for peer_id, snapshot in self.published.items()
+            if peer_id != node_id
+        ]
+        return blockchain.sync_with_candidates(candidates)
@@ -3,6 +3,7 @@ Configuration loader for blockchain assignment
 """
 
 import json
+import os
 
 def load_config(config_file="config.json"):
     """Load configuration from JSON file"""
@@ -20,3 +21,58 @@ def get_node_addresses(config):
 def get_node_log_file(node_id):
     """Get log file path for a node"""
     return f"node_{node_id}_blockchain.json"
+
+def get_node_state_file(node_id):
+    """Get state snapshot file path for a node (see Blockchain.save_state)"""
+    return f"node_{node_id}_state.json"
+
+def get_node_explorer_file(node_id):
+    """Get block explorer index (SQLite) path for a node"""
+    return f"node_{node_id}_explorer.sqlite3"
+
+def get_node_inbox_file(node_id):
+    """Get the file new transactions are submitted through (one JSON dict per line)"""
+    return f"node_{node_id}_inbox.ndjson"
+
+def get_node_trace_file(node_id):
+    """Get block lifecycle trace file (NDJSON) path for a node"""
+    return f"node_{node_id}_trace.ndjson"
+
+def get_node_metrics_file(node_id):
+    """Get metrics file path (Prometheus text format) for a node"""
+    return f"node_{node_id}_metrics.prom"
+
+def _per_node_value(value, node_id):
+    """Pick a node's entry from a per-node setting (list, dict or scalar)"""
+    if isinstance(value, list):
+        return value[node_id] if node_id < len(value) else None
+    if isinstance(value, dict):
+        return value.get(str(node_id), value.get(f"node_{node_id}"))
+    return value
+
+def get_node_cpu_set(config, node_id):
+    """
+    Get the set of CPUs a node process should be pinned to.
+
+    Uses config["cpu_sets"] (one CPU list per node) when given; otherwise
+    nodes are spread round-robin over the CPUs this process may run on.
+    Returns None when the platform has no CPU affinity support.
+    """
+    if not hasattr(os, "sched_getaffinity"):
+        return None
+
+    cpus = _per_node_value(config.get("cpu_sets"), node_id)
+    if cpus:
+        return set(cpus)
+
+    available = sorted(os.sched_getaffinity(0))
+    return {available[node_id % len(available)]}
+
+def get_node_hash_budget(config, node_id):
+    """
+    Get a node's hash-power budget in hashes per second.
+
+    config["hash_power_budget"] can be a single number for every node, a list
+    indexed by node id or a dict keyed by node id. None means unlimited.
+    """
+    return _per_node_value(config.get("hash_power_budget"), node_id)
@@ -9,19 +9,84 @@ import hashlib
 from cryptography.hazmat.primitives.asymmetric import ed25519
 from cryptography.hazmat.primitives import serialization
 
-def hash_data(data):
+def _sha256(data):
+    return hashlib.sha256(data).digest()
+
+def _double_sha256(data):
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+def _blake2b(data):
+    # 64 bytes by default; digest_size=32 makes it a 256-bit hash like the others
+    return hashlib.blake2b(data, digest_size=32).digest()
+
+def _blake2s(data):
+    return hashlib.blake2s(data).digest()
+
+# Hash functions a chain can use for PoW and merkle trees, all with a
+# 32-byte digest so targets and hex hashes look the same for every option
+HASH_FUNCTIONS = {
+    "sha256": _sha256,
+    "sha256d": _double_sha256,
+    "blake2b": _blake2b,
+    "blake2s": _blake2s,
+}
+
+DEFAULT_HASH_FUNCTION = "sha256"
+
+def get_hash_function(name=None):
+    """
+    Look up a hash function by name.
+    
+    Args:
+        name: One of HASH_FUNCTIONS (None means sha256)
+        
+    Returns:
+        Function taking bytes and returning a 32-byte digest
+        
+    Raises:
+        ValueError if the name is unknown
+    """
+    if name is None:
+        name = DEFAULT_HASH_FUNCTION
+    try:
+        return HASH_FUNCTIONS[name]
+    except KeyError:
+        raise ValueError(f"Unknown hash function {name!r} (choose from {', '.join(HASH_FUNCTIONS)})")
+
+def hash_digest(data, hash_function=None):
     """
-    Hash data using SHA256.
+    Raw 32-byte digest of data.
     
     Args:
         data: String or bytes to hash
+        hash_function: Name from HASH_FUNCTIONS (None means sha256)
         
     Returns:
-        Hex string (lowercase) of SHA256 hash
+        Digest bytes
     """
     if isinstance(data, str):
         data = data.encode('utf-8')
-    return hashlib.sha256(data).hexdigest()
+    if hash_function is None:
+        # The PoW inner loop of every SHA256 chain: skip the lookup
+        return hashlib.sha256(data).digest()
+    return get_hash_function(hash_function)(data)
+
+def hash_data(data, hash_function=None):
+    """
+    Hash data using SHA256 (or another function from HASH_FUNCTIONS).
+    
+    Args:
+        data: String or bytes to hash
+        hash_function: Name from HASH_FUNCTIONS (None means sha256)
+        
+    Returns:
+        Hex string (lowercase) of the hash
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    if hash_function is None:
+        return hashlib.sha256(data).hexdigest()
+    return get_hash_function(hash_function)(data).hex()
 
 def generate_key_pair():
     """
@@ -49,7 +114,11 @@ def public_key_to_string(public_key):
         format=serialization.PublicFormat.SubjectPublicKeyInfo
     ).decode('utf-8')
 
-def calculate_merkle_root(transactions):
+def public_key_from_string(key_string):
+    """Load a public key stored with public_key_to_string"""
+    return serialization.load_pem_public_key(key_string.encode('utf-8'))
+
+def calculate_merkle_root(transactions, hash_function=None):
     """
     Calculate the merkle root of a list of transactions.
     
@@ -64,13 +133,15 @@ def calculate_merkle_root(transactions):
     
     Args:
         transactions: List of Transaction objects or transaction hashes
+        hash_function: Hash for the tree nodes, from HASH_FUNCTIONS (None
+                       means sha256); leaves stay the transaction hashes
         
     Returns:
         Merkle root as hex string
     """
     merkleroot = ""
     if not transactions:
-        merkleroot = hash_data("")
+        merkleroot = hash_data("", hash_function)
         return merkleroot
 
     hashes = []
@@ -91,7 +162,7 @@ def calculate_merkle_root(transactions):
         ##hash pairwise         
         for i in range(0,len(hashes),2):
             hashes_together = hashes[i]+hashes[i+1]
-            new_hash = hash_data(hashes_together)
+            new_hash = hash_data(hashes_together, hash_function)
             new_level.append(new_hash)
         
         hashes = new_level 
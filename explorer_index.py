@@ -0,0 +1,263 @@
+"""
+Block Explorer Index
+
+This module keeps persistent secondary indexes of a node's chain in SQLite,
+so explorer queries don't have to scan Blockchain.chain or the JSON logs:
+
+    blocks     height -> hash, timestamp, tx count (hash is indexed too)
+    txs        tx_id -> (height, position), sender, receiver, amount
+    addresses  (address, height, position) for every sender and receiver
+
+The index follows the chain through update(), which the Blockchain calls
+whenever it publishes a snapshot: blocks above the fork point are deleted
+and the new ones inserted, so it stays correct across reorgs and restarts.
+
+Queries are single index lookups or range scans, and address history is
+paginated with a (height, position) cursor instead of OFFSET, so a page
+costs the same at any depth.
+
+Usage:
+    python explorer_index.py 0 tx <tx_id>
+    python explorer_index.py 0 block <hash>
+    python explorer_index.py 0 address <address> [--limit N] [--after HEIGHT:POSITION]
+"""
+
+import argparse
+import json
+import sqlite3
+import threading
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blocks (
+    height INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    timestamp INTEGER,
+    tx_count INTEGER
+);
+CREATE TABLE IF NOT EXISTS txs (
+    tx_id TEXT PRIMARY KEY,
+    height INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    sender TEXT,
+    receiver TEXT,
+    amount
+) WITHOUT ROWID;
+CREATE UNIQUE INDEX IF NOT EXISTS txs_location ON txs (height, position);
+CREATE TABLE IF NOT EXISTS addresses (
+    address TEXT NOT NULL,
+    height INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (address, height, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS addresses_height ON addresses (height);
+"""
+
+class ExplorerIndex:
+    """
+    SQLite indexes over one chain: block hash, tx id and address lookups.
+
+    update() is called by the single chain writer; queries may run on any
+    thread (one connection, guarded by a lock; WAL keeps commits cheap).
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: SQLite database file (":memory:" for a throwaway index)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Bulk (re)indexing on first start touches every page of the indexes
+        self._conn.execute("PRAGMA cache_size=-65536")
+        # Indexes from before amounts kept their JSON type (REAL turned 5 into
+        # 5.0) are dropped; update() then rebuilds them from the chain
+        columns = {row[1]: row[2] for row in self._conn.execute("PRAGMA table_info(txs)")}
+        if columns.get("amount") == "REAL":
+            self._conn.executescript("DROP TABLE addresses; DROP TABLE txs; DROP TABLE blocks;")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            self._conn.close()
+
+    @property
+    def height(self):
+        """Height of the highest indexed block (-1 if empty)"""
+        with self._lock:
+            return self._height()
+
+    def _height(self):
+        row = self._conn.execute("SELECT MAX(height) FROM blocks").fetchone()
+        return -1 if row[0] is None else row[0]
+
+    def _fork_height(self, chain):
+        """Highest height where the index and the chain have the same block"""
+        height = min(self._height(), len(chain) - 1)
+        while height >= 0:
+            row = self._conn.execute("SELECT hash FROM blocks WHERE height = ?", (height,)).fetchone()
+            if row is not None and row[0] == chain[height].hash:
+                break
+            height -= 1
+        return height
+
+    def update(self, chain):
+        """
+        Bring the index in line with a chain (after an append, reorg or load).
+
+        Walks down from the index's own tip to the last block it shares with
+        the chain - usually just one lookup - then replaces everything above.
+
+        Args:
+            chain: Sequence of Block objects (genesis first)
+
+        Returns:
+            Number of blocks indexed
+        """
+        with self._lock:
+            fork_height = self._fork_height(chain)
+            new_blocks = chain[fork_height + 1:]
+            with self._conn:
+                # Roll back the blocks we are leaving behind
+                for table in ("addresses", "txs", "blocks"):
+                    self._conn.execute(f"DELETE FROM {table} WHERE height > ?", (fork_height,))
+                for block in new_blocks:
+                    self._add_block(block)
+            return len(new_blocks)
+
+    def _add_block(self, block):
+        if block.pruned:
+            # Only the header is left (e.g. rebuilding the index on a pruned node)
+            self._conn.execute(
+                "INSERT INTO blocks (height, hash, timestamp, tx_count) VALUES (?, ?, ?, NULL)",
+                (block.index, block.hash, block.timestamp)
+            )
+            return
+        tx_ids = block.tx_ids()
+        self._conn.execute(
+            "INSERT INTO blocks (height, hash, timestamp, tx_count) VALUES (?, ?, ?, ?)",
+            (block.index, block.hash, block.timestamp, len(tx_ids))
+        )
+        height = block.index
+        tx_rows = []
+        address_rows = []
+        for position, (tx_id, (sender, receiver, amount)) in enumerate(zip(tx_ids, block.transfers())):
+            tx_rows.append((tx_id, height, position, sender, receiver, amount))
+            address_rows.append((sender, height, position))
+            address_rows.append((receiver, height, position))
+        # A tx id mined again further up (e.g. a replayed transfer) points at the latest copy
+        self._conn.executemany("INSERT OR REPLACE INTO txs VALUES (?, ?, ?, ?, ?, ?)", tx_rows)
+        # OR IGNORE: a transfer to oneself is one history entry
+        self._conn.executemany("INSERT OR IGNORE INTO addresses VALUES (?, ?, ?)", address_rows)
+
+    # Queries
+
+    def get_block(self, block_hash):
+        """
+        Look up a block by hash.
+
+        Returns:
+            {"height", "hash", "timestamp", "tx_count"}, or None if the block
+            is not on the indexed chain
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT height, hash, timestamp, tx_count FROM blocks WHERE hash = ?",
+                (block_hash,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("height", "hash", "timestamp", "tx_count"), row))
+
+    def get_block_height(self, block_hash):
+        """Height of a block by hash, or None"""
+        block = self.get_block(block_hash)
+        return None if block is None else block["height"]
+
+    def find_transaction(self, tx_id):
+        """
+        Look up where a transaction was mined.
+
+        Returns:
+            {"tx_id", "height", "position", "block_hash", "sender",
+            "receiver", "amount"}, or None if it isn't on the indexed chain
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT t.tx_id, t.height, t.position, b.hash, t.sender, t.receiver, t.amount "
+                "FROM txs t JOIN blocks b ON b.height = t.height WHERE t.tx_id = ?",
+                (tx_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("tx_id", "height", "position", "block_hash", "sender", "receiver", "amount"), row))
+
+    def address_history(self, address, limit=DEFAULT_PAGE_SIZE, after=None):
+        """
+        One page of the transfers an address sent or received, oldest first.
+
+        Args:
+            address: Address to look up
+            limit: Page size (capped at MAX_PAGE_SIZE)
+            after: Cursor from the previous page's "next", None for the first page
+
+        Returns:
+            {"items": [transaction dicts as in find_transaction],
+             "next": cursor for the next page, or None on the last page}
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        after_height, after_position = after if after is not None else (-1, -1)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT t.tx_id, t.height, t.position, b.hash, t.sender, t.receiver, t.amount "
+                "FROM addresses a "
+                "JOIN txs t ON t.height = a.height AND t.position = a.position "
+                "JOIN blocks b ON b.height = a.height "
+                "WHERE a.address = ? AND (a.height, a.position) > (?, ?) "
+                "ORDER BY a.height, a.position LIMIT ?",
+                (address, after_height, after_position, limit + 1)
+            ).fetchall()
+        items = [
+            dict(zip(("tx_id", "height", "position", "block_hash", "sender", "receiver", "amount"), row))
+            for row in rows[:limit]
+        ]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = (items[-1]["height"], items[-1]["position"])
+        return {"items": items, "next": next_cursor}
+
+def main(argv=None):
+    from config import get_node_explorer_file
+
+    parser = argparse.ArgumentParser(description="Query a node's block explorer index")
+    parser.add_argument("node_id", type=int)
+    parser.add_argument("kind", choices=["tx", "block", "address"])
+    parser.add_argument("key", help="Tx id, block hash or address")
+    parser.add_argument("--limit", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--after", help="Address history cursor HEIGHT:POSITION")
+    args = parser.parse_args(argv)
+
+    index = ExplorerIndex(get_node_explorer_file(args.node_id))
+    try:
+        if args.kind == "tx":
+            result = index.find_transaction(args.key)
+        elif args.kind == "block":
+            result = index.get_block(args.key)
+        else:
+            after = tuple(int(x) for x in args.after.split(":")) if args.after else None
+            result = index.address_history(args.key, args.limit, after)
+            if result["next"] is not None:
+                result["next"] = "%d:%d" % result["next"]
+    finally:
+        index.close()
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -4,18 +4,39 @@ Transaction Pool Generator
 This script generates a transaction pool with multiple permutations.
 Each permutation contains all transactions in a different order.
 Nodes are assigned permutations based on config parameters.
+
+Two output formats:
+- stream (default): transactions are streamed to an NDJSON file and each
+  permutation is stored as a uint32 index array plus a shard of uint64
+  byte offsets into the NDJSON file, which nodes read lazily (see tx_pool.py). Chunks of
+  transactions and the permutations are generated in parallel worker
+  processes, each seeded from (seed, chunk/permutation), so the output only
+  depends on the seed and chunk size - not on the number of workers.
+- json: the original single transaction_pool.json with full copies.
+
+Usage:
+    python generate_transactions.py [--format stream|json] [--size N]
+                                    [--seed 42] [--workers N] [--chunk-size N]
 """
 
+import argparse
 import json
 import random
 import hashlib
 import os
 import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 
 # Add current directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from config import load_config
+from tx_pool import (get_pool_dir, permutation_file, shard_file, INDEX_TYPECODE, OFFSET_TYPECODE,
+                     LEGACY_POOL_FILE, MANIFEST_FILE, TRANSACTIONS_FILE, OFFSETS_FILE)
+
+DEFAULT_CHUNK_SIZE = 100000
 
 def generate_addresses(num_addresses):
     """Generate random addresses for transactions"""
@@ -26,23 +47,40 @@ def generate_addresses(num_addresses):
         addresses.append(addr)
     return addresses
 
+def random_transaction(rng, addresses, tx_id):
+    """
+    One random transfer between two different addresses.
+    
+    Args:
+        rng: random.Random (or the random module itself)
+        addresses: Address list from generate_addresses
+        tx_id: Transaction ID to give it
+    """
+    num_addresses = len(addresses)
+    sender_idx = rng.randrange(num_addresses)
+    sender = addresses[sender_idx]
+    # Any address but the sender, without building a candidate list
+    # (same draws as random.choice over the other addresses)
+    receiver_idx = rng.randrange(num_addresses - 1)
+    if receiver_idx >= sender_idx:
+        receiver_idx += 1
+    receiver = addresses[receiver_idx]
+    amount = rng.randint(1, 100)
+    
+    return {
+        "sender": sender,
+        "receiver": receiver,
+        "amount": amount,
+        "tx_id": tx_id
+    }
+
 def generate_transactions(num_transactions, addresses, initial_balance):
     """Generate valid transactions"""
     transactions = []
     random.seed(42)  # For reproducibility
     
     for i in range(num_transactions):
-        sender = random.choice(addresses)
-        receiver = random.choice([a for a in addresses if a != sender])
-        amount = random.randint(1, 100)
-        
-        tx = {
-            "sender": sender,
-            "receiver": receiver,
-            "amount": amount,
-            "tx_id": f"tx_{i:03d}"
-        }
-        transactions.append(tx)
+        transactions.append(random_transaction(random, addresses, f"tx_{i:03d}"))
     
     return transactions
 
@@ -77,9 +115,138 @@ def assign_permutations_to_nodes(permutations, num_nodes):
     
     return assignment
 
-def main():
-    config = load_config()
+def generate_transaction_chunk(job):
+    """
+    Generate one chunk of the streaming pool as NDJSON text.
+    
+    Runs in a worker process. The chunk has its own RNG seeded from the pool
+    seed and the chunk's first tx number.
+    
+    Args:
+        job: (start, count, addresses, seed)
+        
+    Returns:
+        (text, line start offsets relative to the chunk)
+    """
+    start, count, addresses, seed = job
+    rng = random.Random(f"{seed}:tx:{start}")
+    num_addresses = len(addresses)
+    lines = []
+    offsets = array(OFFSET_TYPECODE)
+    position = 0
+    for i in range(start, start + count):
+        sender_idx = rng.randrange(num_addresses)
+        receiver_idx = rng.randrange(num_addresses - 1)
+        if receiver_idx >= sender_idx:
+            receiver_idx += 1
+        amount = rng.randint(1, 100)
+        # Addresses are hex, so plain formatting is valid JSON (and much faster than json.dumps)
+        line = (
+            f'{{"sender": "{addresses[sender_idx]}", "receiver": "{addresses[receiver_idx]}", '
+            f'"amount": {amount}, "tx_id": "tx_{i:03d}"}}\n'
+        )
+        lines.append(line)
+        offsets.append(position)
+        position += len(line)  # ASCII only, so characters == bytes
+    return "".join(lines), offsets
+
+def write_permutation(job):
+    """
+    Shuffle the indices 0..size-1 and write them as a uint32 array, plus
+    the matching shard: the byte offset of each transaction line in
+    permutation order.
+    
+    Runs in a worker process.
     
+    Args:
+        job: (path, shard_path, offsets_path, size, seed, perm_id)
+    """
+    path, shard_path, offsets_path, size, seed, perm_id = job
+    order = array(INDEX_TYPECODE, range(size))
+    random.Random(f"{seed}:perm:{perm_id}").shuffle(order)
+    with open(path, "wb") as f:
+        order.tofile(f)
+    
+    offsets = array(OFFSET_TYPECODE)
+    with open(offsets_path, "rb") as f:
+        offsets.frombytes(f.read())
+    shard = array(OFFSET_TYPECODE, map(offsets.__getitem__, order))
+    with open(shard_path, "wb") as f:
+        shard.tofile(f)
+    return path
+
+def generate_stream_pool(config, pool_dir, seed=42, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Generate the streaming pool (NDJSON transactions + index permutations).
+    
+    The manifest is written last, so a half-generated pool is never used.
+    
+    Args:
+        config: Configuration dictionary
+        pool_dir: Output directory
+        seed: Random seed
+        workers: Worker processes (defaults to the CPU count)
+        chunk_size: Transactions per generated chunk
+        
+    Returns:
+        Manifest dictionary
+    """
+    os.makedirs(pool_dir, exist_ok=True)
+    size = config["transaction_pool_size"]
+    num_permutations = config["num_permutations"]
+    addresses = generate_addresses(20)
+    
+    jobs = [(start, min(chunk_size, size - start), addresses, seed) for start in range(0, size, chunk_size)]
+    tx_path = os.path.join(pool_dir, TRANSACTIONS_FILE)
+    offsets_path = os.path.join(pool_dir, OFFSETS_FILE)
+    perm_files = [permutation_file(k) for k in range(num_permutations)]
+    shard_files = [shard_file(k) for k in range(num_permutations)]
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Chunks come back in order, so both files are written sequentially
+        base = 0
+        with open(f"{tx_path}.tmp", "w") as f, open(offsets_path, "wb") as offsets_out:
+            for text, offsets in executor.map(generate_transaction_chunk, jobs):
+                f.write(text)
+                array(OFFSET_TYPECODE, map(base.__add__, offsets)).tofile(offsets_out)
+                base += len(text)
+        os.replace(f"{tx_path}.tmp", tx_path)
+        
+        perm_jobs = [
+            executor.submit(write_permutation, (
+                os.path.join(pool_dir, perm_files[k]), os.path.join(pool_dir, shard_files[k]),
+                offsets_path, size, seed, k
+            ))
+            for k in range(num_permutations)
+        ]
+        for job in perm_jobs:
+            job.result()
+    
+    assignments = assign_permutations_to_nodes(list(range(num_permutations)), config["num_nodes"])
+    manifest = {
+        "format": "stream",
+        "transaction_count": size,
+        "transactions_file": TRANSACTIONS_FILE,
+        "offsets_file": OFFSETS_FILE,
+        "permutations": perm_files,
+        "shards": shard_files,
+        "index_typecode": INDEX_TYPECODE,
+        "offset_typecode": OFFSET_TYPECODE,
+        "byteorder": sys.byteorder,
+        "node_assignments": {node: entry["permutation_id"] for node, entry in assignments.items()},
+        "addresses": addresses,
+        "initial_balances": {addr: config["initial_balance"] for addr in addresses},
+        "seed": seed,
+        "chunk_size": chunk_size,
+    }
+    manifest_path = os.path.join(pool_dir, MANIFEST_FILE)
+    with open(f"{manifest_path}.tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+    return manifest
+
+def generate_json_pool(config):
+    """Generate the original single-file transaction_pool.json"""
     # Generate addresses (more than needed for variety)
     num_addresses = 20
     addresses = generate_addresses(num_addresses)
@@ -106,13 +273,34 @@ def main():
         "initial_balances": {addr: config["initial_balance"] for addr in addresses}
     }
     
-    with open("transaction_pool.json", "w") as f:
+    with open(LEGACY_POOL_FILE, "w") as f:
         json.dump(pool_data, f, indent=2)
+
+def main(argv=None):
+    config = load_config()
+    parser = argparse.ArgumentParser(description="Generate the transaction pool")
+    parser.add_argument("--format", choices=["stream", "json"],
+                        default=config.get("transaction_pool_format", "stream"))
+    parser.add_argument("--size", type=int, help="number of transactions (default: transaction_pool_size)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+    if args.size:
+        config["transaction_pool_size"] = args.size
+    
+    start = time.perf_counter()
+    if args.format == "json":
+        generate_json_pool(config)
+        location = LEGACY_POOL_FILE
+    else:
+        location = get_pool_dir(config)
+        generate_stream_pool(config, location, args.seed, args.workers, args.chunk_size)
     
-    print(f"Generated {len(transactions)} transactions")
-    print(f"Created {len(permutations)} permutations")
+    print(f"Generated {config['transaction_pool_size']} transactions")
+    print(f"Created {config['num_permutations']} permutations")
     print(f"Assigned to {config['num_nodes']} nodes")
-    print("Transaction pool saved to transaction_pool.json")
+    print(f"Transaction pool saved to {location} ({time.perf_counter() - start:.1f}s)")
 
 if __name__ == "__main__":
     main()
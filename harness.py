@@ -0,0 +1,147 @@
+"""
+In-Process Network Harness
+
+This module runs N NodeFramework instances inside one process. Nodes
+exchange chains through an InMemoryTransport instead of log files, run on
+a ManualClock instead of sleeping, and mine at a low difficulty, so a whole
+network can be driven step by step in milliseconds (integration tests,
+convergence checks, experiments).
+
+Usage:
+    python harness.py [--nodes 20] [--rounds 10] [--miners 3] [--difficulty 1]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+from clock import ManualClock
+from comm import InMemoryTransport
+from config import load_config
+from generate_transactions import generate_addresses, generate_transactions, create_permutations, assign_permutations_to_nodes
+from node_framework import NodeFramework
+
+# Fixed start time so every node creates the same genesis block
+GENESIS_TIME = 1700000000
+
+class InProcessNetwork:
+    """
+    A network of in-process nodes driven explicitly, round by round.
+
+    Nothing runs in the background: step() lets some nodes mine a block,
+    advances the clock and then lets every node sync.
+    """
+
+    def __init__(self, num_nodes, difficulty=1, config=None, seed=42, block_interval=10):
+        """
+        Args:
+            num_nodes: Number of nodes
+            difficulty: PoW difficulty (keep it low; real hashing still runs)
+            config: Base configuration (defaults to config.json)
+            seed: Seed for picking miners
+            block_interval: Simulated seconds the clock advances per round
+        """
+        config = dict(load_config() if config is None else config)
+        config.update(num_nodes=num_nodes, difficulty=difficulty,
+                      difficulty_retargeting=False, metrics_enabled=False,
+                      state_snapshot_interval=0)
+        self.config = config
+        self.rng = random.Random(seed)
+        self.block_interval = block_interval
+        self.clock = ManualClock(GENESIS_TIME)
+        self.transport = InMemoryTransport(config)
+
+        assignments = self._build_assignments(config)
+        self.nodes = [
+            NodeFramework(
+                i, config,
+                transport=self.transport,
+                clock=self.clock,
+                transactions=assignments[f"node_{i}"]["transactions"]
+            )
+            for i in range(num_nodes)
+        ]
+
+    def _build_assignments(self, config):
+        """Per-node transaction lists, generated like transaction_pool.json"""
+        addresses = generate_addresses(20)
+        transactions = generate_transactions(config["transaction_pool_size"], addresses, config["initial_balance"])
+        permutations = create_permutations(transactions, config["num_permutations"])
+        return assign_permutations_to_nodes(permutations, config["num_nodes"])
+
+    def mine(self, node_id):
+        """Let one node mine a block; returns the Block or None"""
+        return self.nodes[node_id]._mine_once()
+
+    def sync_all(self):
+        """Let every node sync once; returns how many switched chains"""
+        return sum(1 for node in self.nodes if node._trigger_sync())
+
+    def step(self, miners=1):
+        """
+        One round: `miners` random nodes each mine a block, the clock
+        advances by block_interval, then every node syncs.
+        """
+        for node_id in self.rng.sample(range(len(self.nodes)), miners):
+            self.mine(node_id)
+        self.clock.advance(self.block_interval)
+        self.sync_all()
+
+    def tips(self):
+        """Set of distinct tip hashes across the network"""
+        return {node.blockchain.snapshot.tip.hash for node in self.nodes}
+
+    def is_converged(self):
+        """True when every node has the same tip"""
+        return len(self.tips()) == 1
+
+    def settle(self, max_rounds=10):
+        """Sync without mining until all nodes agree (or max_rounds runs out)"""
+        for _ in range(max_rounds):
+            if self.is_converged():
+                return True
+            self.sync_all()
+        return self.is_converged()
+
+def run_convergence_test(num_nodes=20, rounds=10, miners=3, difficulty=1, seed=42):
+    """
+    Mine competing blocks for a number of rounds and check that all nodes
+    converge on one chain.
+
+    Returns:
+        Dictionary with converged flag, chain length and wall time
+    """
+    start = time.perf_counter()
+    network = InProcessNetwork(num_nodes, difficulty=difficulty, seed=seed)
+    for _ in range(rounds):
+        network.step(miners=miners)
+    converged = network.settle()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "nodes": num_nodes,
+        "rounds": rounds,
+        "miners_per_round": miners,
+        "converged": converged,
+        "chain_length": network.nodes[0].get_chain_length(),
+        "distinct_tips": len(network.tips()),
+        "wall_seconds": elapsed,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process multi-node harness")
+    parser.add_argument("--nodes", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--miners", type=int, default=3, help="competing miners per round")
+    parser.add_argument("--difficulty", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    result = run_convergence_test(args.nodes, args.rounds, args.miners, args.difficulty, args.seed)
+    print(json.dumps(result, indent=2))
+    return 0 if result["converged"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
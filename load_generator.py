@@ -0,0 +1,322 @@
+"""
+Load Generator
+
+Submits transactions to running nodes at a fixed rate (or a ramp of rates)
+and follows every tx_id until it is buried `depth` blocks deep in the
+consensus chain, then reports throughput and confirmation latency as JSON.
+
+Transactions use the address model of generate_transactions.py and are
+handed to the nodes through their inbox files (node_<id>_inbox.ndjson),
+followed by an {"type": "inbox"} datagram to the node's port so nodes on
+the asyncio runtime pick them up at once (threaded nodes poll the inbox).
+
+The consensus chain is the node log with the most claimed work (ties: the
+smaller tip hash), read from the log headers; a log is only parsed again
+when its tip changes.
+
+With a ramp, each rate runs for --step-seconds. The saturation point is
+the highest offered rate whose confirmed TPS kept up with it (within
+--keep-up) - above it, transactions queue up faster than blocks take them.
+
+Usage:
+    python load_generator.py --rate 20 --duration 60
+    python load_generator.py --ramp 5:50:5 --step-seconds 30 --depth 2
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import socket
+import sys
+import time
+
+# Add current directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import load_config, get_node_log_file, get_node_inbox_file
+from generate_transactions import generate_addresses, random_transaction
+from log_reader import iter_chain_dicts, read_log_header
+
+POLL_INTERVAL = 0.2
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers (None if empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, math.ceil(fraction * len(ordered)) - 1)
+    return round(ordered[index], 3)
+
+class ConsensusWatcher:
+    """Finds when submitted tx_ids reach a given depth in the consensus chain"""
+
+    def __init__(self, config, depth=1):
+        """
+        Args:
+            config: Configuration dictionary (num_nodes)
+            depth: Confirmations required (1 = in the tip block)
+        """
+        self.config = config
+        self.depth = depth
+        self.tip_hash = None
+        self.height = -1
+        self.block_times = []
+        # tx_id -> height in the consensus chain as of the last parse
+        self.locations = {}
+
+    def _best_log(self):
+        best = None
+        for node_id in range(self.config["num_nodes"]):
+            path = get_node_log_file(node_id)
+            try:
+                tip = read_log_header(path).get("tip")
+            except (OSError, ValueError):
+                continue
+            if not tip:
+                continue
+            key = (-tip["chainwork"], tip["hash"])
+            if best is None or key < best[0]:
+                best = (key, path, tip)
+        return best
+
+    def poll(self):
+        """
+        Re-read the consensus chain if its tip changed.
+
+        Returns:
+            True if the tip changed
+        """
+        best = self._best_log()
+        if best is None or best[2]["hash"] == self.tip_hash:
+            return False
+        _, path, tip = best
+        locations = {}
+        block_times = []
+        height = -1
+        try:
+            for block_dict in iter_chain_dicts(path):
+                height = block_dict["index"]
+                block_times.append(block_dict["timestamp"])
+                for tx in block_dict.get("transactions", ()):
+                    locations[tx["tx_id"]] = height
+        except (OSError, ValueError):
+            # Log replaced while we read it; try again on the next poll
+            return False
+        self.tip_hash = tip["hash"]
+        self.height = height
+        self.block_times = block_times
+        self.locations = locations
+        return True
+
+    def is_confirmed(self, tx_id):
+        """True if the tx is at least `depth` blocks deep"""
+        height = self.locations.get(tx_id)
+        return height is not None and self.height - height + 1 >= self.depth
+
+class LoadGenerator:
+    """Submits transactions at a target rate and measures their confirmation"""
+
+    def __init__(self, config, depth=1, fanout=None, seed=None, host="127.0.0.1"):
+        """
+        Args:
+            config: Configuration dictionary
+            depth: Confirmations before a tx counts as confirmed
+            fanout: Nodes each tx is sent to (None = all, like perfect gossip)
+            seed: Seed for the transaction RNG
+            host: Where the nodes listen for inbox notifications
+        """
+        self.config = config
+        self.num_nodes = config["num_nodes"]
+        self.fanout = min(fanout or self.num_nodes, self.num_nodes)
+        self.addresses = generate_addresses(20)
+        self.rng = random.Random(seed)
+        self.run_id = f"{int(time.time())}_{os.getpid()}"
+        self.watcher = ConsensusWatcher(config, depth)
+        self.host = host
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.submitted = {}
+        self.confirmed = {}
+        self.unconfirmed = set()
+        self.next_tx = 0
+        self.next_node = 0
+        # (first, end) tx numbers submitted by each step
+        self.step_ranges = []
+        self.start_height = None
+
+    def close(self):
+        self.socket.close()
+
+    def submit(self, count):
+        """Create `count` transactions and append them to the nodes' inboxes"""
+        if count <= 0:
+            return
+        batches = [[] for _ in range(self.num_nodes)]
+        now = time.time()
+        for _ in range(count):
+            tx = random_transaction(self.rng, self.addresses, f"load_{self.run_id}_{self.next_tx}")
+            self.next_tx += 1
+            line = json.dumps(tx) + "\n"
+            for k in range(self.fanout):
+                batches[(self.next_node + k) % self.num_nodes].append(line)
+            self.next_node = (self.next_node + 1) % self.num_nodes
+            self.submitted[tx["tx_id"]] = now
+            self.unconfirmed.add(tx["tx_id"])
+        for node_id, lines in enumerate(batches):
+            if not lines:
+                continue
+            # One write per batch, so the node never sees a partial line for long
+            with open(get_node_inbox_file(node_id), "a") as f:
+                f.write("".join(lines))
+            try:
+                self.socket.sendto(b'{"type": "inbox"}', (self.host, self.config["base_port"] + node_id))
+            except OSError:
+                pass
+
+    def check_confirmations(self):
+        """Record the confirmation time of newly confirmed transactions"""
+        if not self.watcher.poll():
+            return
+        now = time.time()
+        newly_confirmed = [tx_id for tx_id in self.unconfirmed if self.watcher.is_confirmed(tx_id)]
+        for tx_id in newly_confirmed:
+            self.confirmed[tx_id] = now
+        self.unconfirmed.difference_update(newly_confirmed)
+
+    def run_step(self, rate, seconds):
+        """
+        Offer `rate` tx/s for `seconds` and report what the network did.
+
+        Returns:
+            Dictionary with offered/achieved rates and latency percentiles
+            of the transactions submitted in this step
+        """
+        if self.start_height is None:
+            self.watcher.poll()
+            self.start_height = self.watcher.height
+        start = time.time()
+        first_tx = self.next_tx
+        confirmed_before = len(self.confirmed)
+        height_before = self.watcher.height
+        while True:
+            now = time.time()
+            elapsed = now - start
+            if elapsed >= seconds:
+                break
+            self.submit(int(rate * elapsed) - (self.next_tx - first_tx))
+            self.check_confirmations()
+            time.sleep(POLL_INTERVAL)
+        elapsed = time.time() - start
+        self.step_ranges.append((first_tx, self.next_tx))
+        step = {
+            "offered_rate": rate,
+            "seconds": round(elapsed, 3),
+            # Everything confirmed during the step, whichever step submitted it
+            "tps": round((len(self.confirmed) - confirmed_before) / elapsed, 3) if elapsed else 0.0,
+            "blocks": max(0, self.watcher.height - height_before),
+        }
+        step.update(self._latency_report(first_tx, self.next_tx))
+        return step
+
+    def _latency_report(self, first_tx, end_tx):
+        """Confirmation counts and latency percentiles of tx numbers [first_tx, end_tx)"""
+        step_ids = [f"load_{self.run_id}_{i}" for i in range(first_tx, end_tx)]
+        latencies = [self.confirmed[tx_id] - self.submitted[tx_id] for tx_id in step_ids if tx_id in self.confirmed]
+        return {
+            "submitted": len(step_ids),
+            "confirmed": len(latencies),
+            "latency_p50": percentile(latencies, 0.50),
+            "latency_p95": percentile(latencies, 0.95),
+            "latency_p99": percentile(latencies, 0.99),
+        }
+
+    def drain(self, timeout):
+        """Keep following confirmations (without submitting) for up to `timeout` seconds"""
+        deadline = time.time() + timeout
+        while self.unconfirmed and time.time() < deadline:
+            self.check_confirmations()
+            time.sleep(POLL_INTERVAL)
+
+    def summary(self, steps, keep_up):
+        """Overall report: totals, latency percentiles and the saturation point"""
+        latencies = [self.confirmed[tx_id] - self.submitted[tx_id] for tx_id in self.confirmed]
+        # Late (drained) confirmations count towards the step that submitted them
+        for step, (first_tx, end_tx) in zip(steps, self.step_ranges):
+            step.update(self._latency_report(first_tx, end_tx))
+        saturation_rate = None
+        for step in steps:
+            if step["tps"] >= keep_up * step["offered_rate"]:
+                saturation_rate = step["offered_rate"]
+            else:
+                break
+        # Blocks added to the consensus chain during the run
+        times = self.watcher.block_times[max(0, self.start_height or 0):]
+        return {
+            "max_transactions_per_block": self.config["max_transactions_per_block"],
+            "difficulty": self.config["difficulty"],
+            "depth": self.watcher.depth,
+            "submitted": len(self.submitted),
+            "confirmed": len(self.confirmed),
+            "unconfirmed": len(self.submitted) - len(self.confirmed),
+            "latency_p50": percentile(latencies, 0.50),
+            "latency_p95": percentile(latencies, 0.95),
+            "latency_p99": percentile(latencies, 0.99),
+            "max_tps": max((step["tps"] for step in steps), default=0.0),
+            "saturation_rate": saturation_rate,
+            "mean_block_interval": round((times[-1] - times[0]) / (len(times) - 1), 3) if len(times) > 1 else None,
+            "steps": steps,
+        }
+
+def parse_ramp(text):
+    """'start:stop:step' -> list of rates (stop included)"""
+    start, stop, step = (float(x) for x in text.split(":"))
+    rates = []
+    rate = start
+    while rate <= stop + 1e-9:
+        rates.append(rate)
+        rate += step
+    return rates
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Submit transactions and measure confirmation latency")
+    parser.add_argument("--rate", type=float, default=10.0, help="tx/s (without --ramp)")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds (without --ramp)")
+    parser.add_argument("--ramp", help="start:stop:step tx/s, one step per --step-seconds")
+    parser.add_argument("--step-seconds", type=float, default=30.0)
+    parser.add_argument("--depth", type=int, default=1, help="confirmations required")
+    parser.add_argument("--fanout", type=int, default=None, help="nodes each tx goes to (default: all)")
+    parser.add_argument("--drain", type=float, default=30.0, help="seconds to wait for late confirmations")
+    parser.add_argument("--keep-up", type=float, default=0.9,
+                        help="a step is sustained while tps >= keep_up * offered rate")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    config = load_config()
+    generator = LoadGenerator(config, depth=args.depth, fanout=args.fanout, seed=args.seed)
+    if args.ramp:
+        plan = [(rate, args.step_seconds) for rate in parse_ramp(args.ramp)]
+    else:
+        plan = [(args.rate, args.duration)]
+
+    steps = []
+    try:
+        for rate, seconds in plan:
+            steps.append(generator.run_step(rate, seconds))
+            print(f"rate {rate:g} tx/s: {steps[-1]['tps']} tps confirmed, p95 {steps[-1]['latency_p95']}", file=sys.stderr)
+        generator.drain(args.drain)
+    except KeyboardInterrupt:
+        print("Interrupted, reporting what was measured so far", file=sys.stderr)
+    finally:
+        generator.close()
+
+    report = generator.summary(steps, args.keep_up)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Streaming Log Reader
+
+This module reads a node's JSON log file ({"tip": {...}, "chain": [block_dict, ...]})
+incrementally: the file is read in chunks and the blocks of the "chain"
+array are decoded and yielded one at a time. A caller that stops early
+(e.g. at the first invalid block) never reads or decodes the rest, and
+only about one block plus one chunk is held in memory at a time.
+
+read_log_header returns the small top-level entries written before the
+chain (e.g. the tip a peer claims) without touching the blocks.
+"""
+
+import json
+import re
+
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r"[ \t\n\r]*")
+
+class _StreamBuffer:
+    """Sliding text buffer over a file, refilled on demand"""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """Read the next chunk, dropping what was already consumed"""
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _skip_whitespace(self):
+        while True:
+            self.pos = _whitespace.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self._fill():
+                return
+
+    def peek(self):
+        """Next non-whitespace character"""
+        self._skip_whitespace()
+        if self.pos >= len(self.buf):
+            raise ValueError("Unexpected end of log file")
+        return self.buf[self.pos]
+
+    def take(self, expected):
+        """Consume the next character, which must be one of `expected`"""
+        char = self.peek()
+        if char not in expected:
+            raise ValueError(f"Expected one of {expected!r} at offset {self.pos}, got {char!r}")
+        self.pos += 1
+        return char
+
+    def decode(self):
+        """Decode the next complete JSON value"""
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                # A value ending exactly at the buffer end may be cut short (e.g. a number)
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+def iter_chain_dicts(file_path, key="chain", chunk_size=CHUNK_SIZE):
+    """
+    Yield the block dictionaries of a log file one at a time.
+
+    Other top-level keys before the chain are skipped; anything after the
+    chain array is not read.
+
+    Args:
+        file_path: Path to the JSON log file
+        key: Top-level key holding the block array
+        chunk_size: Characters read from the file at a time
+
+    Raises:
+        ValueError (incl. json.JSONDecodeError) if the file is malformed
+    """
+    with open(file_path, "r") as f:
+        stream = _StreamBuffer(f, chunk_size)
+        stream.take("{")
+        if stream.peek() == "}":
+            return
+        while True:
+            name = stream.decode()
+            stream.take(":")
+            if name != key:
+                stream.decode()
+            else:
+                stream.take("[")
+                if stream.peek() == "]":
+                    return
+                while True:
+                    yield stream.decode()
+                    if stream.take(",]") == "]":
+                        return
+            if stream.take(",}") == "}":
+                return
+
+def read_log_header(file_path, key="chain", chunk_size=4096):
+    """
+    Read the top-level entries that come before the chain array.
+
+    Args:
+        file_path: Path to the JSON log file
+        key: Top-level key holding the block array (reading stops there)
+        chunk_size: Characters read from the file at a time
+
+    Returns:
+        Dictionary of the entries before the chain (empty for old logs
+        that only hold the chain)
+
+    Raises:
+        ValueError (incl. json.JSONDecodeError) if the file is malformed
+    """
+    header = {}
+    with open(file_path, "r") as f:
+        stream = _StreamBuffer(f, chunk_size)
+        stream.take("{")
+        if stream.peek() == "}":
+            return header
+        while True:
+            name = stream.decode()
+            stream.take(":")
+            if name == key:
+                return header
+            header[name] = stream.decode()
+            if stream.take(",}") == "}":
+                return header
@@ -0,0 +1,176 @@
+"""
+Runtime Metrics
+
+This module provides lightweight counters, gauges and summaries for the
+node hot paths (mining, chain lock, sync, persistence) and renders them
+in the Prometheus text exposition format.
+
+A disabled Metrics object returns immediately from every call, so the
+instrumentation can stay in place with almost no overhead.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+PREFIX = "blockchain_"
+
+# name -> (type, help text)
+METRIC_HELP = {
+    "pow_hashes_total": ("counter", "Nonces tried while mining"),
+    "pow_hashrate": ("gauge", "Hashes per second while mining the last block"),
+    "pow_block_seconds": ("summary", "Wall time spent mining a block"),
+    "blocks_mined_total": ("counter", "Blocks mined by this node"),
+    "mining_aborted_total": ("counter", "Mining attempts given up before a nonce was found"),
+    "mining_stale_total": ("counter", "Blocks found after the tip had already moved on"),
+    "blocks_pruned_total": ("counter", "Block bodies dropped in pruned mode"),
+    "txs_submitted_total": ("counter", "Submitted transactions by outcome (accepted, duplicate, invalid)"),
+    "template_wait_seconds": ("summary", "Time the miner waited for the next block template"),
+    "mining": ("gauge", "1 while the node is running proof-of-work"),
+    "syncing": ("gauge", "1 while the node is syncing with peers"),
+    "chain_lock_wait_seconds": ("summary", "Time spent waiting for chain_lock"),
+    "chain_lock_hold_seconds": ("summary", "Time chain_lock was held"),
+    "sync_seconds": ("summary", "Duration of a sync round"),
+    "sync_blocks_parsed_total": ("counter", "Peer blocks deserialized during sync"),
+    "sync_blocks_validated_total": ("counter", "Peer blocks that passed full validation (header and body) during sync"),
+    "sync_blocks_assumed_valid_total": ("counter", "Peer blocks accepted below an assume-valid checkpoint without body checks"),
+    "sync_peers_skipped_total": ("counter", "Peer chains skipped because they already failed unchanged"),
+    "sync_peers_rejected_total": ("counter", "Peer chains rejected as invalid or not matching their claim"),
+    "chain_switches_total": ("counter", "Times sync adopted a peer chain"),
+    "reorg_depth": ("summary", "Blocks rolled back when switching to a peer chain"),
+    "orphan_blocks": ("gauge", "Blocks waiting in the orphan pool for their parent"),
+    "orphan_blocks_connected_total": ("counter", "Pooled orphan blocks connected to the chain"),
+    "cache_hits_total": ("counter", "Cache lookups answered without a rebuild (cache: template, pending_scan)"),
+    "cache_misses_total": ("counter", "Cache lookups that needed a rebuild (cache: template, pending_scan)"),
+    "persist_seconds": ("summary", "Time to write the chain to disk"),
+    "load_seconds": ("summary", "Time to load the chain from disk"),
+    "chain_height": ("gauge", "Height of the current chain tip"),
+    "difficulty": ("gauge", "Difficulty of the last mined block"),
+}
+
+class Metrics:
+    """
+    Thread-safe registry of counters, gauges and summaries.
+
+    Every value is keyed by metric name plus labels. Labels passed to the
+    constructor (e.g. node id) are added to every sample.
+    """
+
+    def __init__(self, enabled=True, labels=None):
+        """
+        Args:
+            enabled: False turns every call into a no-op
+            labels: Dictionary of labels added to every sample
+        """
+        self.enabled = enabled
+        self.labels = labels or {}
+        self._lock = threading.Lock()
+        self._values = {}
+        self._summaries = {}
+
+    def _key(self, name, labels):
+        return (name, tuple(sorted(labels.items())))
+
+    def inc(self, name, value=1, **labels):
+        """Increase a counter"""
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        """Set a gauge"""
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            self._values[key] = value
+
+    def observe(self, name, value, **labels):
+        """Record one observation of a summary (count, sum and max are kept)"""
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                self._summaries[key] = [1, value, value]
+            else:
+                summary[0] += 1
+                summary[1] += value
+                if value > summary[2]:
+                    summary[2] = value
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Context manager that observes the wall time of its body"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def get(self, name, **labels):
+        """Current value of a counter/gauge, or (count, sum, max) of a summary"""
+        key = self._key(name, labels)
+        with self._lock:
+            if key in self._summaries:
+                return tuple(self._summaries[key])
+            return self._values.get(key)
+
+    def _format_labels(self, labels, extra=()):
+        items = list(self.labels.items()) + list(labels) + list(extra)
+        if not items:
+            return ""
+        body = ",".join(f'{k}="{v}"' for k, v in items)
+        return "{" + body + "}"
+
+    def render(self):
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            String with HELP/TYPE headers and one line per sample
+        """
+        with self._lock:
+            values = dict(self._values)
+            summaries = {key: list(summary) for key, summary in self._summaries.items()}
+
+        by_name = {}
+        for (name, labels), value in values.items():
+            by_name.setdefault(name, []).append((labels, value))
+        for (name, labels), summary in summaries.items():
+            by_name.setdefault(name, []).append((labels, summary))
+
+        lines = []
+        for name in sorted(by_name):
+            metric_type, help_text = METRIC_HELP.get(name, ("untyped", name))
+            full_name = PREFIX + name
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {metric_type}")
+            for labels, value in sorted(by_name[name], key=lambda sample: sample[0]):
+                if isinstance(value, list):
+                    count, total, maximum = value
+                    lines.append(f"{full_name}{self._format_labels(labels, [('quantile', '1')])} {maximum}")
+                    lines.append(f"{full_name}_sum{self._format_labels(labels)} {total}")
+                    lines.append(f"{full_name}_count{self._format_labels(labels)} {count}")
+                else:
+                    lines.append(f"{full_name}{self._format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, file_path):
+        """Write the rendered metrics to a file (atomically, for scrapers)"""
+        if not self.enabled:
+            return
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.render())
+        os.replace(tmp_path, file_path)
+
+# Shared disabled instance used when nobody asked for metrics
+NULL_METRICS = Metrics(enabled=False)
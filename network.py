@@ -1,67 +1,64 @@
-import subprocess
-import time
-import requests
-import json
-from multiprocessing import Process
-
-# Configuration
-NUM_NODES = 5
-BASE_PORT = 5000
-NODE_SCRIPT = "run_node.py"
-
-def start_node(node_id):
-    """Start a single node in a subprocess."""
-    port = BASE_PORT + node_id
-    print(f"Starting node {node_id} on port {port}")
-    return subprocess.Popen(["python", NODE_SCRIPT, str(node_id)])
-
-def verify_node(node_id):
-    """Verify that a node is running and return its status."""
-    port = BASE_PORT + node_id
-    try:
-        response = requests.get(f"http://localhost:{port}/status", timeout=2)
-        if response.status_code == 200:
-            return response.json()
-    except:
-        pass
-    return None
-
-def monitor_nodes():
-    """Monitor all nodes and display their status."""
-    print("\n=== Node Status ===")
-    for i in range(NUM_NODES):
-        status = verify_node(i)
-        if status:
-            print(f"Node {i}: Running (Chain length: {status.get('chain_length', 'N/A')}, "
-                  f"Peers: {len(status.get('peers', []))})")
-        else:
-            print(f"Node {i}: Not responding")
-
-def main():
-    # Start all nodes
-    processes = []
-    for i in range(NUM_NODES):
-        p = Process(target=start_node, args=(i,))
-        p.start()
-        processes.append(p)
-        time.sleep(1)  # Give each node a moment to start
-
-    try:
-        # Initial status
-        time.sleep(5)  # Wait for nodes to initialize
-        monitor_nodes()
-        
-        # Keep monitoring until interrupted
-        while True:
-            time.sleep(10)
-            monitor_nodes()
-            
-    except KeyboardInterrupt:
-        print("\nShutting down nodes...")
-        for p in processes:
-            p.terminate()
-        for p in processes:
-            p.join()
-
-if __name__ == "__main__":
-    main()
\ No newline at end of file
+import time
+from config import load_config, get_node_log_file
+from log_reader import read_log_header
+from setup_network import NodeLauncher
+
+def verify_node(node_id, config):
+    """
+    Read a node's status from the tip claimed at the top of its log file.
+
+    Nodes don't serve HTTP, so the log is the status: only its header is
+    read, not the chain.
+
+    Returns:
+        {"chain_length", "tip_hash", "chainwork"}, or None if the node has
+        no readable log yet
+    """
+    try:
+        tip = read_log_header(get_node_log_file(node_id)).get("tip")
+    except (OSError, ValueError):
+        return None
+    if not tip:
+        return None
+    return {"chain_length": tip["height"] + 1, "tip_hash": tip["hash"], "chainwork": tip["chainwork"]}
+
+def monitor_nodes(launcher, config):
+    """Monitor all nodes and display their status."""
+    print("\n=== Node Status ===")
+    for i in range(config["num_nodes"]):
+        process = launcher.processes.get(i)
+        if process is None or process.poll() is not None:
+            print(f"Node {i}: Not running")
+            continue
+
+        status = verify_node(i, config)
+        chain_length = status["chain_length"] if status else "N/A"
+        tip = status["tip_hash"][:12] if status else "N/A"
+        print(f"Node {i}: Running (pid {process.pid}, Chain length: {chain_length}, Tip: {tip}, "
+              f"Restarts: {launcher.restarts.get(i, 0)})")
+
+def main():
+    config = load_config()
+
+    # Start all nodes
+    launcher = NodeLauncher(config)
+    launcher.start_all()
+
+    try:
+        # Initial status
+        time.sleep(5)  # Wait for nodes to initialize
+        monitor_nodes(launcher, config)
+        
+        # Keep monitoring until interrupted, restarting crashed nodes
+        while True:
+            for _ in range(10):
+                time.sleep(1)
+                launcher.check_nodes()
+            monitor_nodes(launcher, config)
+            
+    except KeyboardInterrupt:
+        print("\nShutting down nodes...")
+        launcher.stop_all()
+
+if __name__ == "__main__":
+    main()
@@ -6,14 +6,28 @@ It handles node lifecycle, mining triggers, and sync coordination.
 Students' Blockchain class is integrated here.
 """
 
+import itertools
 import json
 import os
 import time
 import threading
-from config import load_config, get_node_log_file, get_node_addresses
-from comm import get_peer_log_files, get_all_node_states
-from transaction import Transaction
+from contextlib import contextmanager
+from config import load_config, get_node_log_file, get_node_addresses, get_node_hash_budget, get_node_metrics_file, get_node_state_file, get_node_explorer_file, get_node_inbox_file, get_node_trace_file
+from comm import get_peer_log_files, get_all_node_states, get_peer_addresses, FileTransport
+from transaction import Transaction, check_transactions
+from block import Block
 from blockchain import Blockchain
+from metrics import Metrics
+from tracing import Tracer
+from clock import SYSTEM_CLOCK
+from tx_pool import load_node_transactions
+from block_template import BlockTemplate, TemplateBuilder
+from crypto_utils import calculate_merkle_root
+from explorer_index import ExplorerIndex, DEFAULT_PAGE_SIZE
+from bloom import RotatingBloomFilter
+
+# Transactions submit_transactions takes from its input at a time
+SUBMIT_CHUNK_SIZE = 4096
 
 class NodeFramework:
     """
@@ -21,133 +35,560 @@ class NodeFramework:
     This handles orchestration - students implement Blockchain class logic.
     """
     
-    def __init__(self, node_id, config):
+    def __init__(self, node_id, config, transport=None, clock=None, transactions=None):
+        """
+        Args:
+            node_id: Node number
+            config: Configuration dictionary
+            transport: How chains are exchanged with peers (defaults to
+                       FileTransport, i.e. the JSON log files)
+            clock: Time source for timestamps and sleeps (defaults to wall-clock)
+            transactions: Assigned transaction dicts; if None they are read
+                          from the transaction pool (see tx_pool)
+        """
         self.node_id = node_id
         self.config = config
         self.log_file = get_node_log_file(node_id)
-        self.blockchain = Blockchain()
+        self.state_file = get_node_state_file(node_id)
+        self.state_interval = config.get("state_snapshot_interval", 100)
+        self.transport = transport or FileTransport(config)
+        self.clock = clock or SYSTEM_CLOCK
+        self.blockchain = Blockchain(config, clock=self.clock)
+        self.blockchain.max_hash_rate = get_node_hash_budget(config, node_id)
         self.running = False
+        self.stopping = False
         self.mining_thread = None
         self.sync_thread = None
+        self.metrics_thread = None
+        
+        # Instrumentation of the hot paths (no-op unless metrics_enabled)
+        self.metrics = Metrics(
+            enabled=config.get("metrics_enabled", False),
+            labels={"node": node_id}
+        )
+        self.metrics_file = get_node_metrics_file(node_id)
+        self.blockchain.metrics = self.metrics
+        
+        # Block lifecycle trace (see tracing.py; no-op unless tracing_enabled)
+        self.tracer = Tracer(
+            get_node_trace_file(node_id), node_id, clock=self.clock,
+            enabled=config.get("tracing_enabled", False)
+        )
+        self.blockchain.tracer = self.tracer
         
-        # CRITICAL FIX: Add lock to prevent mining during sync
+        # Block hash / tx id / address indexes for explorer queries
+        self.explorer = None
+        if config.get("explorer_index", False):
+            self.explorer = ExplorerIndex(get_node_explorer_file(node_id))
+            self.blockchain.explorer = self.explorer
+        
+        # Writer lock: serializes mining, sync and saves. Readers don't take
+        # it - they use the immutable self.blockchain.snapshot instead.
         self.chain_lock = threading.Lock()
         
+        # Prepares the next block's transactions while the current one is mined
+        self.template_builder = TemplateBuilder(self._build_template)
+        
         # Load initial state
+        self._restored_mempool = None
+        # (snapshot, index): assigned transactions before index are all mined in that snapshot
+        self._pending_from = (None, 0)
         self._load_blockchain()
         
+        # Transactions submitted while running (see submit_transactions / read_inbox)
+        self.submitted_transactions = []
+        self._submitted_ids = set()
+        # Guards the two above; held once per batch of new transactions
+        self.mempool_lock = threading.Lock()
+        # Recently seen tx_ids, so gossiped copies are dropped before any checks
+        self.seen_tx_filter = RotatingBloomFilter(
+            config.get("tx_filter_capacity", 100000),
+            config.get("tx_filter_error_rate", 0.0001)
+        )
+        self._filter_lock = threading.Lock()
+        # Parsed public keys of transaction senders (see check_transactions)
+        self._sender_keys = {}
+        self.inbox_file = get_node_inbox_file(node_id)
+        self._inbox_offset = 0
+        
         # Load transaction assignments
-        self._load_transaction_assignments()
+        if transactions is not None:
+            self.assigned_transactions = transactions
+        else:
+            self._load_transaction_assignments()
+        if self._restored_mempool:
+            # Transactions submitted before the restart (the inbox won't hand
+            # them over again). Mined ones are kept too, a later reorg may
+            # unmine them; _pending_transactions skips them until then.
+            self.submitted_transactions.extend(self._restored_mempool)
+            self._submitted_ids.update(tx.get("tx_id") for tx in self._restored_mempool)
     
     def _load_blockchain(self):
         """Load blockchain from log file or create genesis"""
-        if os.path.exists(self.log_file):
-            self.blockchain.load_from_file(self.log_file)
-        else:
+        state = self.blockchain.load_state(self.state_file) if self.state_interval else None
+        if not self.transport.load(self.node_id, self.blockchain, state):
             # Create genesis block
             genesis = self.blockchain.create_genesis_block()
             self.blockchain.chain = [genesis]
             self._save_blockchain()
+            state = None
+        
+        if state is not None and self.blockchain.state_matches(self.blockchain.chain, state):
+            self._restored_mempool = state.get("mempool")
+            self._state_height = state["height"]
+            # We validated our chain up to the state's tip ourselves, so
+            # syncing a chain through that block can skip the bodies below it
+            self.blockchain.add_checkpoint(state["height"], state["tip_hash"])
+        else:
+            self._state_height = 0
+    
+    def _save_state(self, force=False):
+        """
+        Write a state snapshot (tip, chainwork, tx index, balances, mempool)
+        every state_interval blocks, so restarts only replay the blocks after it,
+        then prune the block bodies it covers (if prune_depth is set).
+        Must be called with chain_lock held.
+        """
+        if not self.state_interval:
+            return
+        height = self.blockchain.snapshot.height
+        if not force and abs(height - self._state_height) < self.state_interval:
+            return
+        # Assigned transactions are reloaded from the pool on restart; the
+        # submitted ones are only here, mined or not (a reorg may unmine them)
+        with self.mempool_lock:
+            mempool = list(self.submitted_transactions)
+        try:
+            self.blockchain.save_state(self.state_file, mempool=mempool)
+            self._state_height = height
+        except OSError as e:
+            print(f"Node {self.node_id} state snapshot error: {e}")
+            return
+        # Bodies covered by the snapshot can go (pruned mode only)
+        self.blockchain.prune_bodies(height)
+    
+    def _pending_transactions(self, limit=None):
+        """
+        Assigned (then submitted) transactions not yet in the current chain,
+        in that order.
+        
+        The scan resumes after the leading run of mined transactions found
+        last time, as long as the chain has only grown since then (a reorg
+        may unmine them, so it starts over).
+        
+        Holds mempool_lock for the scan (submissions wait until it's done).
+        
+        Args:
+            limit: Stop after this many pending transactions (None = all)
+        """
+        snapshot = self.blockchain.snapshot
+        # Miner, template builder and inbox reader may run side by side
+        with self.mempool_lock:
+            base, start = self._pending_from
+            if base is None or base.height >= len(snapshot.chain) or snapshot.chain[base.height].hash != base.tip.hash:
+                start = 0
+                self.metrics.inc("cache_misses_total", cache="pending_scan")
+            else:
+                self.metrics.inc("cache_hits_total", cache="pending_scan")
+            
+            assigned = self.assigned_transactions
+            submitted = self.submitted_transactions
+            num_assigned = len(assigned)
+            pending = []
+            for i in range(start, num_assigned + len(submitted)):
+                tx = assigned[i] if i < num_assigned else submitted[i - num_assigned]
+                if snapshot.contains_tx(tx.get("tx_id")):
+                    if not pending:
+                        start = i + 1
+                    continue
+                pending.append(tx)
+                if limit and len(pending) >= limit:
+                    break
+            self._pending_from = (snapshot, start)
+        return pending
     
     def _save_blockchain(self):
         """Save blockchain to log file"""
         # CRITICAL FIX: Use lock when saving
+        with self._locked("save"):
+            self.transport.publish(self.node_id, self.blockchain)
+    
+    @contextmanager
+    def _locked(self, path):
+        """
+        Hold chain_lock, recording wait and hold times when metrics are on.
+        
+        Args:
+            path: Label for who takes the lock (mining, sync, save, read)
+        """
+        if not self.metrics.enabled:
+            with self.chain_lock:
+                yield
+            return
+        
+        requested = time.perf_counter()
         with self.chain_lock:
-            self.blockchain.save_to_file(self.log_file)
+            acquired = time.perf_counter()
+            self.metrics.observe("chain_lock_wait_seconds", acquired - requested, path=path)
+            try:
+                yield
+            finally:
+                self.metrics.observe("chain_lock_hold_seconds", time.perf_counter() - acquired, path=path)
     
     def _load_transaction_assignments(self):
         """Load assigned transactions from transaction pool"""
-        with open("transaction_pool.json", "r") as f:
-            pool_data = json.load(f)
+        self.assigned_transactions = load_node_transactions(self.node_id, self.config)
+    
+    def add_transactions(self, tx_dicts):
+        """
+        Queue new transactions for mining (after the assigned ones), in one
+        locked step. No checks beyond skipping duplicates; untrusted input
+        goes through submit_transactions.
         
-        node_key = f"node_{self.node_id}"
-        if node_key in pool_data["node_assignments"]:
-            self.assigned_transactions = pool_data["node_assignments"][node_key]["transactions"]
-        else:
-            self.assigned_transactions = []
+        Transactions already queued or already mined are skipped.
+        
+        Args:
+            tx_dicts: Iterable of transaction dictionaries
+            
+        Returns:
+            Number of transactions added
+        """
+        snapshot = self.blockchain.snapshot
+        added = 0
+        with self.mempool_lock:
+            submitted_ids = self._submitted_ids
+            for tx in tx_dicts:
+                tx_id = tx.get("tx_id")
+                if tx_id in submitted_ids or snapshot.contains_tx(tx_id):
+                    continue
+                submitted_ids.add(tx_id)
+                self.submitted_transactions.append(tx)
+                added += 1
+        return added
+    
+    def submit_transactions(self, tx_dicts):
+        """
+        Take in a batch (or stream) of new transactions from clients or gossip.
+        
+        The input is worked through SUBMIT_CHUNK_SIZE transactions at a time:
+        1. tx_ids seen recently are dropped first, by a rotating Bloom filter
+           (a tx gossiped many times is only checked once; a false positive
+           drops a new tx with probability about tx_filter_error_rate)
+        2. format, hash and signature of the rest are checked in bulk (see
+           check_transactions)
+        3. the valid ones are queued in one locked step (add_transactions)
+           and only then remembered in the filter, so a malformed copy sent
+           first can't get the real transaction dropped as a duplicate
+        
+        Args:
+            tx_dicts: Iterable of transaction dictionaries (a list or a generator)
+            
+        Returns:
+            Dictionary of counts: accepted, duplicate and invalid
+        """
+        counts = {"accepted": 0, "duplicate": 0, "invalid": 0}
+        seen = self.seen_tx_filter
+        tx_dicts = iter(tx_dicts)
+        while True:
+            chunk = list(itertools.islice(tx_dicts, SUBMIT_CHUNK_SIZE))
+            if not chunk:
+                break
+            fresh = []
+            with self._filter_lock:
+                for tx in chunk:
+                    tx_id = tx.get("tx_id") if isinstance(tx, dict) else None
+                    if not isinstance(tx_id, str):
+                        counts["invalid"] += 1
+                    elif tx_id in seen:
+                        counts["duplicate"] += 1
+                    else:
+                        fresh.append(tx)
+            valid = check_transactions(fresh, self._sender_keys)
+            counts["invalid"] += len(fresh) - len(valid)
+            with self._filter_lock:
+                for tx in valid:
+                    seen.add(tx["tx_id"])
+            added = self.add_transactions(valid)
+            counts["duplicate"] += len(valid) - added
+            counts["accepted"] += added
+        metrics = self.metrics
+        if metrics.enabled:
+            for outcome, count in counts.items():
+                metrics.inc("txs_submitted_total", count, outcome=outcome)
+        return counts
+    
+    def read_inbox(self):
+        """
+        Pick up transactions appended to the node's inbox file since last time.
+        
+        The inbox (node_<id>_inbox.ndjson) holds one transaction dict per
+        line; clients such as load_generator.py append to it. Only complete
+        lines are read, so a line being written is picked up next time.
+        
+        Returns:
+            Number of transactions accepted (see submit_transactions)
+        """
+        try:
+            if os.path.getsize(self.inbox_file) <= self._inbox_offset:
+                return 0
+            with open(self.inbox_file, "rb") as f:
+                f.seek(self._inbox_offset)
+                data = f.read()
+        except OSError:
+            return 0
+        end = data.rfind(b"\n") + 1
+        self._inbox_offset += end
+        transactions = []
+        for line in data[:end].splitlines():
+            try:
+                transactions.append(json.loads(line))
+            except ValueError:
+                print(f"Node {self.node_id}: skipping malformed inbox line")
+        return self.submit_transactions(transactions)["accepted"]
     
     def _mining_loop(self):
         """Continuous mining loop"""
         while self.running:
             try:
-                # CRITICAL FIX: Acquire lock before mining
-                with self.chain_lock:
-                    # Get pending transactions (from assigned set)
-                    pending = [tx for tx in self.assigned_transactions if not self._is_transaction_mined(tx)]
-                    
-                    if len(pending) > 0:
-                        # Select transactions to mine (students implement selection logic)
-                        selected = self.blockchain.select_transactions(
-                            pending,
-                            self.config["max_transactions_per_block"]
-                        )
-                        
-                        if len(selected) > 0:
-                            # Sign transactions (students implement)
-                            signed_txs = []
-                            for tx_dict in selected:
-                                tx = Transaction.from_dict(tx_dict)
-                                # Students implement signing
-                                signed_tx = self.blockchain.sign_transaction(tx)
-                                signed_txs.append(signed_tx)
-                            
-                            # Mine block (students implement)
-                            block = self.blockchain.mine_block(
-                                signed_txs,
-                                self.config["difficulty"]
-                            )
-                            
-                            if block:
-                                # Save inside the lock
-                                self.blockchain.save_to_file(self.log_file)
-                                # Note: sync will happen in sync_loop
+                self.read_inbox()
+                block = self._mine_once()
                 
-                # CRITICAL FIX: Add delay after releasing lock
-                # This gives sync thread a chance to run
-                time.sleep(0.5)
+                # Straight on to the next block (its template is already being
+                # built); only back off when there was nothing to mine
+                if block is None:
+                    self.clock.sleep(0.5)
                 
             except Exception as e:
                 print(f"Node {self.node_id} mining error: {e}")
-                time.sleep(1)
+                self.clock.sleep(1)
+    
+    def _build_template(self, exclude_ids=()):
+        """
+        Select, sign and merkle-root the next block's transactions.
+        
+        Reads only the current snapshot, so it runs without chain_lock
+        (on the template builder thread, or inline when there is none).
+        
+        Args:
+            exclude_ids: Tx ids to leave out (the block being mined right now)
+            
+        Returns:
+            BlockTemplate, or None if there is nothing to mine
+        """
+        limit = self.config["max_transactions_per_block"]
+        # Get pending transactions (from assigned set)
+        pending = self._pending_transactions(limit + len(exclude_ids))
+        if exclude_ids:
+            pending = [tx for tx in pending if tx.get("tx_id") not in exclude_ids]
+        
+        # Select transactions to mine (students implement selection logic)
+        selected = self.blockchain.select_transactions(pending, limit)
+        if len(selected) == 0:
+            return None
+        
+        # Sign transactions (students implement)
+        signed_txs = []
+        for tx_dict in selected:
+            tx = Transaction.from_dict(tx_dict)
+            # Students implement signing
+            signed_tx = self.blockchain.sign_transaction(tx)
+            signed_txs.append(signed_tx)
+        return BlockTemplate(signed_txs, calculate_merkle_root(signed_txs, self.blockchain.hash_function))
+    
+    def _next_template(self):
+        """The prefetched template if it is still valid, else one built now"""
+        snapshot = self.blockchain.snapshot
+        template = None
+        if self.template_builder.running:
+            start = time.perf_counter()
+            template = self.template_builder.take()
+            self.metrics.observe("template_wait_seconds", time.perf_counter() - start)
+        if template is None or not template.is_valid_for(snapshot):
+            self.metrics.inc("cache_misses_total", cache="template")
+            template = self._build_template()
+        else:
+            self.metrics.inc("cache_hits_total", cache="template")
+        return template
+    
+    def _mine_once(self):
+        """
+        Mine and publish one block from the pending transactions, if any.
+        
+        Proof-of-work runs without chain_lock, on the tip as it was when
+        mining started; it is abandoned as soon as sync moves the tip. The
+        lock is only taken to append and publish the block. Meanwhile the
+        template builder (if running) prepares the next block's body.
+        
+        Returns:
+            The mined Block, or None if there was nothing to mine (or the
+            tip moved on)
+        """
+        prepared = self._prepare_block()
+        if prepared is None:
+            return None
+        block, snapshot = prepared
+        if not self._solve_block(block, snapshot):
+            return None
+        if not self._commit_block(block, snapshot):
+            return None
+        return block
+    
+    def _prepare_block(self):
+        """
+        Put the next template on top of the current tip.
+        
+        Returns:
+            (unsolved Block, snapshot it builds on), or None if there is
+            nothing to mine
+        """
+        template = self._next_template()
+        if template is None:
+            return None
+        if self.template_builder.running:
+            self.template_builder.prefetch(template.tx_ids)
+        
+        snapshot = self.blockchain.snapshot
+        block = self.blockchain.prepare_block(
+            template.transactions,
+            self.config["difficulty"],
+            chain=snapshot.chain,
+            merkle_root=template.merkle_root
+        )
+        return block, snapshot
+    
+    def _solve_block(self, block, snapshot, should_abort=None):
+        """
+        Run proof-of-work on a prepared block (without chain_lock).
+        
+        Gives up when the node stops, the tip moves away from `snapshot` or
+        should_abort() returns True.
+        
+        Returns:
+            True if a nonce was found
+        """
+        # Mine block (students implement)
+        self.metrics.set("mining", 1)
+        try:
+            return self.blockchain.solve_block(
+                block,
+                should_abort=lambda: (self.stopping
+                                      or self.blockchain.snapshot.tip is not snapshot.tip
+                                      or (should_abort is not None and should_abort()))
+            )
+        finally:
+            self.metrics.set("mining", 0)
+    
+    def _commit_block(self, block, snapshot):
+        """
+        Append and publish a solved block, unless the tip moved meanwhile.
+        
+        Returns:
+            True if the block was added to the chain
+        """
+        with self._locked("mining"):
+            if self.blockchain.snapshot.tip is not snapshot.tip:
+                # Sync switched chains between our last check and now
+                self.metrics.inc("mining_stale_total")
+                return False
+            self.tracer.event("mined", block)
+            self.blockchain.append_block(block)
+            # Save inside the lock
+            self.transport.publish(self.node_id, self.blockchain)
+            self.tracer.event("persisted", block)
+            self._save_state()
+            # Note: sync will happen in sync_loop
+        return True
     
     def _is_transaction_mined(self, tx_dict):
         """Check if transaction is already in blockchain"""
-        tx_id = tx_dict.get("tx_id")
-        for block in self.blockchain.chain:
-            for tx in block.transactions:
-                if isinstance(tx, dict) and tx.get("tx_id") == tx_id:
-                    return True
-                elif hasattr(tx, "tx_id") and tx.tx_id == tx_id:
-                    return True
-        return False
+        return self.blockchain.snapshot.contains_tx(tx_dict.get("tx_id"))
     
     def _sync_loop(self):
         """Periodic sync loop"""
         while self.running:
-            time.sleep(self.config["sync_frequency_seconds"])
+            self.clock.sleep(self.config["sync_frequency_seconds"])
             self._trigger_sync()
     
     def _trigger_sync(self):
-        """Trigger sync with peers"""
+        """
+        Trigger sync with peers.
+        
+        Returns:
+            True if the node switched to a peer chain
+        """
         try:
             # CRITICAL FIX: Acquire lock during sync
-            with self.chain_lock:
-                peer_files = get_peer_log_files(self.node_id, self.config)
-                updated = self.blockchain.sync_with_peer_logs(peer_files)
+            with self._locked("sync"):
+                self.metrics.set("syncing", 1)
+                try:
+                    updated = self.transport.sync(self.node_id, self.blockchain)
+                    if updated:
+                        # Save inside the lock
+                        self.transport.publish(self.node_id, self.blockchain)
+                        self._save_state()
+                    return updated
+                finally:
+                    self.metrics.set("syncing", 0)
+        except Exception as e:
+            print(f"Node {self.node_id} sync error: {e}")
+            return False
+    
+    def receive_block(self, block_dict, peer=None, size=None):
+        """
+        Take a block a peer pushed to us; blocks may arrive in any order
+        (see Blockchain.receive_block).
+        
+        Args:
+            block_dict: Block in its to_dict form
+            peer: Who sent it
+            size: Size of the message in bytes, if known
+            
+        Returns:
+            True if the node switched to a better chain
+        """
+        try:
+            block = Block.from_dict(block_dict)
+        except (KeyError, TypeError, ValueError):
+            return False
+        try:
+            with self._locked("sync"):
+                updated = self.blockchain.receive_block(block, peer=peer, size=size)
                 if updated:
                     # Save inside the lock
-                    self.blockchain.save_to_file(self.log_file)
+                    self.transport.publish(self.node_id, self.blockchain)
+                    self._save_state()
+                return updated
         except Exception as e:
-            print(f"Node {self.node_id} sync error: {e}")
+            print(f"Node {self.node_id} block error: {e}")
+            return False
+    
+    def _metrics_loop(self):
+        """Periodically write metrics to the node's metrics file"""
+        while self.running:
+            self.clock.sleep(self.config.get("metrics_interval_seconds", 5))
+            self.write_metrics()
+    
+    def write_metrics(self):
+        """Write current metrics (Prometheus text format) to the metrics file"""
+        try:
+            self.metrics.write(self.metrics_file)
+        except OSError as e:
+            print(f"Node {self.node_id} metrics error: {e}")
+    
+    def get_metrics(self):
+        """Get current metrics in Prometheus text format (for a status endpoint)"""
+        return self.metrics.render()
     
     def start(self):
         """Start the node (mining and syncing)"""
         self.running = True
+        self.stopping = False
         
         # Initial sync
         self._trigger_sync()
         
         # Start mining thread
+        self.template_builder.start()
         self.mining_thread = threading.Thread(target=self._mining_loop, daemon=True)
         self.mining_thread.start()
         
@@ -155,23 +596,77 @@ class NodeFramework:
         self.sync_thread = threading.Thread(target=self._sync_loop, daemon=True)
         self.sync_thread.start()
         
+        # Start metrics writer
+        if self.metrics.enabled:
+            self.metrics_thread = threading.Thread(target=self._metrics_loop, daemon=True)
+            self.metrics_thread.start()
+        
         print(f"Node {self.node_id} started")
     
     def stop(self):
         """Stop the node"""
         self.running = False
+        self.stopping = True
+        self.template_builder.stop()
         if self.mining_thread:
             self.mining_thread.join(timeout=1)
         if self.sync_thread:
             self.sync_thread.join(timeout=1)
+        # Flush the block store so a restart picks up exactly where we stopped
+        self._save_blockchain()
+        with self._locked("save"):
+            self._save_state(force=True)
+        self.blockchain.close()
+        if self.explorer is not None:
+            self.explorer.close()
+        self.tracer.close()
+        self.write_metrics()
         print(f"Node {self.node_id} stopped")
     
+    # Read-only accessors: lock-free, served from the current chain snapshot
+    
     def get_chain_length(self):
         """Get current chain length"""
-        with self.chain_lock:
-            return len(self.blockchain.chain)
+        return self.blockchain.snapshot.height + 1
     
     def get_cumulative_pow(self):
         """Get cumulative PoW of current chain"""
-        with self.chain_lock:
-            return self.blockchain.calculate_cumulative_pow(self.blockchain.chain)
\ No newline at end of file
+        return self.blockchain.snapshot.chainwork
+    
+    def get_balance(self, address):
+        """Get balance of an address on the current chain"""
+        return self.blockchain.snapshot.get_balance(address)
+    
+    def get_block_by_hash(self, block_hash):
+        """Get a block on the current chain by hash (None if not found or no explorer index)"""
+        if self.explorer is None:
+            return None
+        height = self.explorer.get_block_height(block_hash)
+        snapshot = self.blockchain.snapshot
+        # The index may be a block ahead of or behind this snapshot
+        if height is None or height > snapshot.height or snapshot.chain[height].hash != block_hash:
+            return None
+        return snapshot.chain[height]
+    
+    def find_transaction(self, tx_id):
+        """Get where a transaction was mined (see ExplorerIndex.find_transaction)"""
+        if self.explorer is None:
+            return None
+        return self.explorer.find_transaction(tx_id)
+    
+    def get_address_history(self, address, limit=DEFAULT_PAGE_SIZE, after=None):
+        """Get one page of an address's transfers (see ExplorerIndex.address_history)"""
+        if self.explorer is None:
+            return {"items": [], "next": None}
+        return self.explorer.address_history(address, limit, after)
+    
+    def get_status(self):
+        """Get a status summary of the node (for monitoring/status endpoints)"""
+        snapshot = self.blockchain.snapshot
+        return {
+            "node_id": self.node_id,
+            "chain_length": snapshot.height + 1,
+            "tip_hash": snapshot.tip.hash,
+            "cumulative_pow": snapshot.chainwork,
+            "peers": get_peer_addresses(self.node_id, self.config),
+        }
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""
+Orphan Block Pool
+
+Holds blocks that arrived before their parent, keyed by parent hash, so a
+block fetched out of order doesn't have to be thrown away and fetched
+again. Once the parent shows up, Blockchain.receive_block takes the
+waiting blocks back out and connects them.
+
+The pool is bounded: a block expires after expiry_seconds, and when the
+pool holds more than max_blocks blocks or max_bytes bytes the oldest
+blocks are evicted first.
+
+Not thread-safe on its own; the Blockchain uses it from the chain writer
+only.
+"""
+
+import json
+from collections import OrderedDict
+from clock import SYSTEM_CLOCK
+
+def estimate_block_size(block):
+    """Bytes of a block as JSON, the way it travels between nodes"""
+    return len(json.dumps(block.to_dict()))
+
+class OrphanPool:
+    """Bounded pool of blocks waiting for their parent"""
+
+    def __init__(self, max_blocks=100, max_bytes=8 * 1024 * 1024, expiry_seconds=600, clock=None):
+        """
+        Args:
+            max_blocks: Most blocks held at once
+            max_bytes: Most block bytes held at once (see estimate_block_size)
+            expiry_seconds: Blocks older than this are dropped
+            clock: Time source for expiry (defaults to wall-clock)
+        """
+        self.max_blocks = max_blocks
+        self.max_bytes = max_bytes
+        self.expiry_seconds = expiry_seconds
+        self.clock = clock or SYSTEM_CLOCK
+        # hash -> (block, size, time added), oldest first
+        self._blocks = OrderedDict()
+        # parent hash -> {hash: None} (an ordered set) of the blocks building on it
+        self._by_parent = {}
+        self.bytes = 0
+
+    def __len__(self):
+        return len(self._blocks)
+
+    def __contains__(self, block_hash):
+        return block_hash in self._blocks
+
+    def get(self, block_hash):
+        """The pooled block with this hash, or None"""
+        entry = self._blocks.get(block_hash)
+        return None if entry is None else entry[0]
+
+    def add(self, block, size=None):
+        """
+        Hold a block until its parent arrives.
+
+        Args:
+            block: Block whose parent is unknown (or not connected yet)
+            size: Size in bytes, if known (estimated otherwise)
+
+        Returns:
+            True if the block was added, False if it was already held or is
+            bigger than the whole pool
+        """
+        if block.hash in self._blocks:
+            return False
+        if size is None:
+            size = estimate_block_size(block)
+        if size > self.max_bytes:
+            return False
+        self.expire()
+        self._blocks[block.hash] = (block, size, self.clock.time())
+        self._by_parent.setdefault(block.previous_hash, {})[block.hash] = None
+        self.bytes += size
+        # Over a limit: evict the oldest blocks first
+        while len(self._blocks) > self.max_blocks or self.bytes > self.max_bytes:
+            self.remove(next(iter(self._blocks)))
+        return block.hash in self._blocks
+
+    def children(self, parent_hash):
+        """Pooled blocks whose previous_hash is parent_hash (oldest first)"""
+        hashes = self._by_parent.get(parent_hash)
+        if not hashes:
+            return []
+        return [self._blocks[block_hash][0] for block_hash in hashes]
+
+    def root_of(self, block):
+        """
+        The lowest pooled ancestor of a block: follows previous_hash through
+        the pool until the parent isn't pooled (the block itself if its
+        parent isn't).
+        """
+        seen = set()
+        while block.previous_hash in self._blocks and block.hash not in seen:
+            seen.add(block.hash)
+            block = self._blocks[block.previous_hash][0]
+        return block
+
+    def remove(self, block_hash):
+        """
+        Take one block out of the pool.
+
+        Returns:
+            The block, or None if it wasn't pooled
+        """
+        entry = self._blocks.pop(block_hash, None)
+        if entry is None:
+            return None
+        block, size, _ = entry
+        self.bytes -= size
+        siblings = self._by_parent.get(block.previous_hash)
+        if siblings is not None:
+            siblings.pop(block_hash, None)
+            if not siblings:
+                del self._by_parent[block.previous_hash]
+        return block
+
+    def remove_descendants(self, block_hash):
+        """
+        Drop a block and every pooled block building on it (e.g. after it
+        failed validation).
+
+        Returns:
+            Number of blocks dropped
+        """
+        dropped = 0
+        stack = [block_hash]
+        while stack:
+            current = stack.pop()
+            stack.extend(self._by_parent.get(current, ()))
+            if self.remove(current) is not None:
+                dropped += 1
+        return dropped
+
+    def expire(self, now=None):
+        """
+        Drop blocks older than expiry_seconds.
+
+        Returns:
+            Number of blocks dropped
+        """
+        if not self.expiry_seconds:
+            return 0
+        if now is None:
+            now = self.clock.time()
+        dropped = 0
+        # Insertion order is age order
+        while self._blocks:
+            block_hash, (_, _, added) = next(iter(self._blocks.items()))
+            if now - added < self.expiry_seconds:
+                break
+            self.remove(block_hash)
+            dropped += 1
+        return dropped
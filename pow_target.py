@@ -0,0 +1,73 @@
+"""
+Proof-of-Work Targets
+
+A block is valid when its hash, read as a 256-bit integer, is at most its
+target. Difficulty d (in "hex zeros") corresponds to the target
+2^256 / 16^d - 1, so whole-number difficulties are exactly the old
+leading-zeros rule, but any fractional difficulty works too.
+
+Targets are stored in block headers in compact form ("bits", as in
+Bitcoin's nBits): one size byte plus a 3-byte mantissa. That rounds the
+target down, so a compact block at whole difficulty d is slightly harder
+than d leading zeros (its work is a little above 16^d).
+"""
+
+import math
+
+MAX_TARGET = 2 ** 256 - 1
+
+def difficulty_to_target(difficulty):
+    """
+    Target for a (possibly fractional) difficulty in hex zeros.
+
+    Args:
+        difficulty: Expected hashes per block are 16^difficulty
+
+    Returns:
+        Integer target (hash <= target meets it)
+    """
+    if difficulty <= 0:
+        return MAX_TARGET
+    whole = int(difficulty)
+    if whole == difficulty:
+        # Exact for whole numbers: same as `difficulty` leading hex zeros
+        return (1 << (256 - 4 * whole)) - 1
+    return min(MAX_TARGET, int(2 ** (256 - 4 * difficulty)) - 1)
+
+def target_to_difficulty(target):
+    """Difficulty in hex zeros of a target (inverse of difficulty_to_target)"""
+    return math.log(2 ** 256 / (target + 1), 16)
+
+def target_to_work(target):
+    """
+    Expected hashes to find a block at this target.
+
+    For a whole-number difficulty d this is exactly 16^d.
+    """
+    return 2 ** 256 // (target + 1)
+
+def target_to_bits(target):
+    """
+    Compact encoding of a target.
+
+    The mantissa keeps the 3 most significant bytes, so the encoded target
+    is rounded down (slightly harder, never easier).
+    """
+    size = (target.bit_length() + 7) // 8
+    if size <= 3:
+        mantissa = target << (8 * (3 - size))
+    else:
+        mantissa = target >> (8 * (size - 3))
+    # The top mantissa bit is a sign bit in this encoding
+    if mantissa & 0x800000:
+        mantissa >>= 8
+        size += 1
+    return (size << 24) | mantissa
+
+def bits_to_target(bits):
+    """Decode a compact target"""
+    size = bits >> 24
+    mantissa = bits & 0x7fffff
+    if size <= 3:
+        return mantissa >> (8 * (3 - size))
+    return mantissa << (8 * (size - 3))
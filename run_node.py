@@ -5,9 +5,25 @@ This script runs a single node for testing purposes.
 For full network, use setup_network.py
 """
 
+import asyncio
+import signal
 import sys
 from config import load_config
 from node_framework import NodeFramework
+from async_runtime import AsyncNodeRuntime
+
+def _handle_sigterm(signum, frame):
+    """Turn SIGTERM into KeyboardInterrupt so the node shuts down gracefully"""
+    raise KeyboardInterrupt
+
+async def run_async(node):
+    """Run a node on the asyncio runtime until SIGINT/SIGTERM"""
+    runtime = AsyncNodeRuntime(node)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, runtime.request_stop)
+    print(f"Node {node.node_id} running. Press Ctrl+C to stop.")
+    await runtime.run()
 
 def main():
     if len(sys.argv) < 2:
@@ -22,9 +38,16 @@ def main():
         print(f"Error: node_id must be < {config['num_nodes']}")
         sys.exit(1)
     
+    # The launcher stops nodes with SIGTERM; flush to disk just like on Ctrl+C
+    signal.signal(signal.SIGTERM, _handle_sigterm)
+    
     # Create and start node
     node = NodeFramework(node_id, config)
     
+    if config.get("node_runtime", "threads") == "asyncio":
+        asyncio.run(run_async(node))
+        return
+    
     try:
         node.start()
         
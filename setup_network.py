@@ -2,33 +2,144 @@
 Network Setup Script
 
 This script spawns multiple blockchain nodes on different ports.
-Each node runs as a separate process.
+Each node runs as a separate process, pinned to its own set of CPUs,
+and is restarted by the launcher if it crashes.
 """
 
-import subprocess
-import time
+import os
 import signal
+import subprocess
 import sys
-from config import load_config
+import time
+from config import load_config, get_node_cpu_set
+from tx_pool import pool_exists
+
+NODE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "run_node.py")
+
+class NodeLauncher:
+    """
+    Starts, pins, supervises and stops the node processes of a network.
+
+    Every node runs `run_node.py <node_id>` in its own process. Before the
+    node starts, the child is pinned to its CPU set with os.sched_setaffinity,
+    so the mining and sync threads it creates later inherit the same set.
+    """
+
+    def __init__(self, config, max_restarts=None, restart_delay=None):
+        """
+        Args:
+            config: Configuration dictionary
+            max_restarts: Restarts allowed per node before giving up
+            restart_delay: Seconds to wait before restarting a crashed node
+        """
+        self.config = config
+        self.max_restarts = max_restarts if max_restarts is not None else config.get("max_node_restarts", 5)
+        self.restart_delay = restart_delay if restart_delay is not None else config.get("restart_delay_seconds", 1)
+        self.processes = {}
+        self.restarts = {}
+        self.running = False
+
+    def start_node(self, node_id):
+        """
+        Start a single node process.
+
+        Args:
+            node_id: Node to start
+
+        Returns:
+            subprocess.Popen handle of the node process
+        """
+        cpus = get_node_cpu_set(self.config, node_id)
+        preexec_fn = None
+        if cpus and hasattr(os, "sched_setaffinity"):
+            # Runs in the child before exec, so the whole node inherits it
+            preexec_fn = lambda: os.sched_setaffinity(0, cpus)
+
+        pinned = f" on CPUs {sorted(cpus)}" if preexec_fn else ""
+        print(f"Starting node {node_id} (port {self.config['base_port'] + node_id}){pinned}...")
+        process = subprocess.Popen(
+            [sys.executable, NODE_SCRIPT, str(node_id)],
+            preexec_fn=preexec_fn
+        )
+        self.processes[node_id] = process
+        return process
+
+    def start_all(self):
+        """Start every node listed in the config"""
+        self.running = True
+        for i in range(self.config["num_nodes"]):
+            self.restarts[i] = 0
+            self.start_node(i)
+        return list(self.processes.values())
+
+    def check_nodes(self):
+        """
+        Restart nodes that exited while the network is running.
+
+        Nodes never exit on their own, so any exit here is a crash. Each node
+        is restarted at most max_restarts times.
+
+        Returns:
+            List of node ids that were restarted
+        """
+        restarted = []
+        if not self.running:
+            return restarted
+
+        for node_id, process in list(self.processes.items()):
+            code = process.poll()
+            if code is None:
+                continue
+            if self.restarts[node_id] >= self.max_restarts:
+                print(f"Node {node_id} exited with code {code}, restart limit reached")
+                del self.processes[node_id]
+                continue
+
+            print(f"Node {node_id} exited with code {code}, restarting...")
+            self.restarts[node_id] += 1
+            time.sleep(self.restart_delay)
+            self.start_node(node_id)
+            restarted.append(node_id)
+        return restarted
+
+    def stop_all(self, timeout=10):
+        """
+        Stop every node gracefully.
+
+        Nodes get SIGTERM first so they can flush their block store to disk;
+        any node still alive after the timeout is killed.
+
+        Args:
+            timeout: Seconds to wait for all nodes to exit
+        """
+        self.running = False
+        for process in self.processes.values():
+            if process.poll() is None:
+                process.terminate()
+
+        deadline = time.time() + timeout
+        for node_id, process in self.processes.items():
+            try:
+                process.wait(timeout=max(0, deadline - time.time()))
+            except subprocess.TimeoutExpired:
+                print(f"Node {node_id} did not stop in time, killing it")
+                process.kill()
+                process.wait()
+
+def _handle_sigterm(signum, frame):
+    """Turn SIGTERM into KeyboardInterrupt so shutdown takes the Ctrl+C path"""
+    raise KeyboardInterrupt
 
 def spawn_nodes(config):
     """Spawn all node processes"""
-    processes = []
-    
-    for i in range(config["num_nodes"]):
-        # Spawn node process
-        # In a real implementation, this would start node_framework.py for each node
-        # For now, we'll create a simple runner
-        print(f"Starting node {i}...")
-        # Note: Actual implementation would use multiprocessing or subprocess
-        # This is a placeholder - students don't need to modify this
-    
-    return processes
+    launcher = NodeLauncher(config)
+    launcher.start_all()
+    return launcher
 
 def main():
     """Main setup function"""
     config = load_config()
-    
+
     print("=" * 50)
     print("Blockchain Network Setup")
     print("=" * 50)
@@ -36,27 +147,29 @@ def main():
     print(f"Base port: {config['base_port']}")
     print(f"Difficulty: {config['difficulty']} leading zeros")
     print("=" * 50)
-    
+
     # Generate transaction pool if not exists
-    import os
-    if not os.path.exists("transaction_pool.json"):
+    if not pool_exists(config):
         print("Generating transaction pool...")
         from generate_transactions import main as gen_main
-        gen_main()
-    
+        gen_main([])
+
     # Spawn nodes
     print("\nStarting nodes...")
-    processes = spawn_nodes(config)
-    
+    launcher = spawn_nodes(config)
+
+    # Treat SIGTERM like Ctrl+C so the nodes still get a graceful shutdown
+    signal.signal(signal.SIGTERM, _handle_sigterm)
+
     print("\nNodes started. Press Ctrl+C to stop.")
-    
+
     try:
         while True:
             time.sleep(1)
+            launcher.check_nodes()
     except KeyboardInterrupt:
         print("\nStopping nodes...")
-        for p in processes:
-            p.terminate()
+        launcher.stop_all()
         print("All nodes stopped.")
 
 if __name__ == "__main__":
@@ -0,0 +1,313 @@
+"""
+Discrete-Event Network Simulator
+
+This script simulates a whole network of nodes without real proof-of-work
+or real processes, to test consensus convergence at scale:
+
+- Block finding is a Poisson process per node: a node with hash rate h at
+  difficulty d finds blocks at rate h / 16^d, so real hashing is replaced by
+  drawing the next block time from an exponential distribution.
+- Every node publishes its chain (like writing its log file); a peer sees a
+  publication after the link latency between the two nodes.
+- Every node syncs every sync interval with a sample of its peers, using the
+  real Blockchain fork-choice (is_better_chain) and validation code.
+
+Runs are deterministic for a given seed. The report covers fork rate,
+orphan rate, reorg depths and time to convergence.
+
+Usage:
+    python simulator.py [--nodes 1000] [--duration 3600] [--seed 42]
+                        [--block-time 10] [--latency 0.05] [--output FILE]
+"""
+
+import argparse
+import bisect
+import heapq
+import json
+import random
+import sys
+import time
+
+from block import Block
+from blockchain import Blockchain
+from config import load_config
+from crypto_utils import hash_data
+
+# Event kinds
+MINE = 0
+SYNC = 1
+
+class SimNode:
+    """State of one simulated node"""
+
+    __slots__ = ("node_id", "hash_rate", "latency", "chain", "chainwork",
+                 "generation", "publish_times", "publications")
+
+    def __init__(self, node_id, hash_rate, latency, genesis):
+        self.node_id = node_id
+        self.hash_rate = hash_rate
+        self.latency = latency
+        self.chain = (genesis,)
+        self.chainwork = 1
+        # Bumped on every tip change; pending MINE events of older generations are stale
+        self.generation = 0
+        # Every chain this node ever published, for latency-delayed peer reads
+        self.publish_times = [0.0]
+        self.publications = [(self.chain, self.chainwork)]
+
+    def publish(self, now):
+        """Publish the current chain (the simulated log file write)"""
+        self.publish_times.append(now)
+        self.publications.append((self.chain, self.chainwork))
+
+    def visible_at(self, when):
+        """The chain a peer reading this node's log at `when` would see"""
+        if self.publish_times[-1] <= when:
+            return self.publications[-1]
+        i = bisect.bisect_right(self.publish_times, when) - 1
+        return self.publications[max(i, 0)]
+
+class NetworkSimulator:
+    """
+    Seeded discrete-event simulation of mining and sync.
+
+    Consensus decisions go through a Blockchain instance used as the rules
+    engine: validate_chain checks every newly adopted block and
+    is_better_chain picks between competing chains, so the simulator tests
+    the same fork-choice code the real nodes run.
+    """
+
+    def __init__(self, num_nodes, duration, seed=42, difficulty=5, hash_rate=600000,
+                 hash_rate_spread=0.5, block_time=None, latency=0.05, latency_jitter=0.5,
+                 sync_interval=5, peers_per_sync=8, settle_time=600):
+        """
+        Args:
+            num_nodes: Number of simulated nodes
+            duration: Simulated seconds of mining
+            seed: Random seed (same seed, same run)
+            difficulty: Hex zeros required per block, may be fractional (sets expected hashes)
+            hash_rate: Mean hashes/sec per node
+            hash_rate_spread: Relative spread of node hash rates (lognormal sigma)
+            block_time: If set, hash rates are scaled so the network finds a
+                        block every block_time seconds on average
+            latency: Mean one-way latency of a node's link in seconds
+            latency_jitter: Relative spread of link latencies
+            sync_interval: Seconds between sync rounds of a node
+            peers_per_sync: Peers read per sync round (capped at num_nodes - 1),
+                            drawn at random with replacement
+            settle_time: Simulated seconds allowed after mining stops to converge
+        """
+        self.rng = random.Random(seed)
+        self.duration = duration
+        self.sync_interval = sync_interval
+        self.peers_per_sync = min(peers_per_sync, num_nodes - 1)
+        self.settle_time = settle_time
+        self.rules = Blockchain()
+
+        genesis = Block(0, "0", hash_data(""), 0, 0, 0, [])
+        self.expected_hashes = 16 ** difficulty
+        rates = [hash_rate * self.rng.lognormvariate(0, hash_rate_spread) for _ in range(num_nodes)]
+        if block_time:
+            scale = self.expected_hashes / (block_time * sum(rates))
+            rates = [rate * scale for rate in rates]
+
+        self.nodes = [
+            SimNode(i, rates[i], latency * self.rng.uniform(1 - latency_jitter, 1 + latency_jitter), genesis)
+            for i in range(num_nodes)
+        ]
+        self.events = []
+        self.sequence = 0
+        self.now = 0.0
+        self.mining = True
+
+        # Statistics
+        self.blocks_mined = 0
+        self.heights_mined = {}
+        self.reorg_depths = []
+        self.tip_counts = {genesis.hash: num_nodes}
+        self.converged_since = 0.0
+        self.converged_time = 0.0
+        self.validated_blocks = 0
+
+    def _schedule(self, when, kind, node_id, payload=None):
+        self.sequence += 1
+        heapq.heappush(self.events, (when, self.sequence, kind, node_id, payload))
+
+    def _schedule_mining(self, node):
+        """Draw the time until the node finds a block on its current tip"""
+        node.generation += 1
+        if not self.mining or node.hash_rate <= 0:
+            return
+        delay = self.rng.expovariate(node.hash_rate / self.expected_hashes)
+        self._schedule(self.now + delay, MINE, node.node_id, node.generation)
+
+    def _set_chain(self, node, chain, chainwork):
+        """Switch a node to a new tip and keep the convergence bookkeeping"""
+        old_tip = node.chain[-1].hash
+        new_tip = chain[-1].hash
+        was_converged = len(self.tip_counts) == 1
+
+        self.tip_counts[old_tip] -= 1
+        if not self.tip_counts[old_tip]:
+            del self.tip_counts[old_tip]
+        self.tip_counts[new_tip] = self.tip_counts.get(new_tip, 0) + 1
+
+        node.chain = chain
+        node.chainwork = chainwork
+        node.publish(self.now)
+
+        converged = len(self.tip_counts) == 1
+        if was_converged and not converged:
+            self.converged_time += self.now - self.converged_since
+        elif converged and not was_converged:
+            self.converged_since = self.now
+
+    def _on_mine(self, node, generation):
+        if generation != node.generation or not self.mining:
+            return
+        tip = node.chain[-1]
+        block = Block(tip.index + 1, tip.hash, hash_data(""), self.rng.getrandbits(32),
+                      int(self.now), 0, [])
+        self.blocks_mined += 1
+        self.heights_mined.setdefault(block.index, set()).add(block.hash)
+
+        self._set_chain(node, node.chain + (block,), node.chainwork + self.rules.calculate_block_work(block))
+        self._schedule_mining(node)
+
+    def _on_sync(self, node):
+        best_chain, best_work = node.chain, node.chainwork
+        nodes = self.nodes
+        others = len(nodes) - 1
+        random = self.rng.random
+        # Peers are drawn with replacement; cheap and fine at scale
+        for _ in range(self.peers_per_sync):
+            peer_id = int(random() * others)
+            if peer_id >= node.node_id:
+                peer_id += 1
+            peer = nodes[peer_id]
+            chain, work = peer.visible_at(self.now - node.latency - peer.latency)
+            if chain is best_chain:
+                continue
+            if self.rules.is_better_chain(work, chain[-1].hash, best_work, best_chain[-1].hash):
+                best_chain, best_work = chain, work
+
+        if best_chain is not node.chain:
+            fork_height = self.rules.find_fork_height(node.chain, best_chain)
+            # Only the blocks we don't already have need validating
+            self.validated_blocks += len(best_chain) - fork_height - 1
+            if self.rules.validate_chain(best_chain, start_height=fork_height + 1):
+                depth = len(node.chain) - fork_height - 1
+                if depth:
+                    self.reorg_depths.append(depth)
+                self._set_chain(node, best_chain, best_work)
+                self._schedule_mining(node)
+
+        if self.mining or len(self.tip_counts) > 1:
+            self._schedule(self.now + self.sync_interval, SYNC, node.node_id)
+
+    def run(self):
+        """
+        Run the simulation to the end and return the report.
+
+        Mining stops after `duration`; syncing continues until all nodes agree
+        on one tip or settle_time runs out.
+        """
+        for node in self.nodes:
+            self._schedule_mining(node)
+            self._schedule(self.rng.uniform(0, self.sync_interval), SYNC, node.node_id)
+
+        mining_end = self.duration
+        deadline = self.duration + self.settle_time
+        while self.events:
+            when, _, kind, node_id, payload = heapq.heappop(self.events)
+            if when > mining_end and self.mining:
+                self.now = mining_end
+                self.mining = False
+                if len(self.tip_counts) == 1:
+                    break
+            if when > deadline:
+                break
+            self.now = when
+            node = self.nodes[node_id]
+            if kind == MINE:
+                self._on_mine(node, payload)
+            else:
+                self._on_sync(node)
+            if not self.mining and len(self.tip_counts) == 1:
+                break
+
+        if len(self.tip_counts) == 1:
+            self.converged_time += min(self.now, self.duration) - min(self.converged_since, self.duration)
+        return self.report()
+
+    def report(self):
+        """Summarize the run"""
+        best = self.nodes[0]
+        for node in self.nodes[1:]:
+            if self.rules.is_better_chain(node.chainwork, node.chain[-1].hash, best.chainwork, best.chain[-1].hash):
+                best = node
+        final_length = len(best.chain) - 1
+        forked_heights = sum(1 for hashes in self.heights_mined.values() if len(hashes) > 1)
+        converged = len(self.tip_counts) == 1
+        depths = sorted(self.reorg_depths)
+
+        return {
+            "nodes": len(self.nodes),
+            "simulated_seconds": self.duration,
+            "blocks_mined": self.blocks_mined,
+            "consensus_chain_length": final_length,
+            "orphan_rate": 1 - final_length / self.blocks_mined if self.blocks_mined else 0.0,
+            "fork_rate": forked_heights / len(self.heights_mined) if self.heights_mined else 0.0,
+            "mean_block_interval": self.duration / final_length if final_length else None,
+            "reorgs": len(depths),
+            "max_reorg_depth": depths[-1] if depths else 0,
+            "mean_reorg_depth": sum(depths) / len(depths) if depths else 0.0,
+            "blocks_validated": self.validated_blocks,
+            "converged": converged,
+            "time_to_convergence": self.now - self.duration if converged else None,
+            "fraction_of_time_converged": self.converged_time / self.duration if self.duration else 0.0,
+        }
+
+def main():
+    config = load_config()
+    parser = argparse.ArgumentParser(description="Discrete-event blockchain network simulator")
+    parser.add_argument("--nodes", type=int, default=config["num_nodes"])
+    parser.add_argument("--duration", type=float, default=3600, help="simulated seconds of mining")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--difficulty", type=float, default=config["difficulty"])
+    parser.add_argument("--hash-rate", type=float, default=600000, help="mean hashes/sec per node")
+    parser.add_argument("--hash-rate-spread", type=float, default=0.5)
+    parser.add_argument("--block-time", type=float, help="scale hash rates to this network block time")
+    parser.add_argument("--latency", type=float, default=0.05, help="mean one-way link latency (s)")
+    parser.add_argument("--sync-interval", type=float, default=config["sync_frequency_seconds"])
+    parser.add_argument("--peers-per-sync", type=int, default=8)
+    parser.add_argument("--settle-time", type=float, default=600)
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args()
+
+    simulator = NetworkSimulator(
+        num_nodes=args.nodes,
+        duration=args.duration,
+        seed=args.seed,
+        difficulty=args.difficulty,
+        hash_rate=args.hash_rate,
+        hash_rate_spread=args.hash_rate_spread,
+        block_time=args.block_time,
+        latency=args.latency,
+        sync_interval=args.sync_interval,
+        peers_per_sync=args.peers_per_sync,
+        settle_time=args.settle_time,
+    )
+    start = time.perf_counter()
+    report = simulator.run()
+    report["wall_seconds"] = time.perf_counter() - start
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""Assume-valid checkpoints during sync"""
+
+import pytest
+
+from block import Block
+from blockchain import AssumeValidCheck, Blockchain
+from clock import ManualClock
+from transaction import Transaction
+
+def _tx(tx_id):
+    return Transaction.from_dict({"sender": "alice", "receiver": "bob", "amount": 1, "tx_id": tx_id})
+
+@pytest.fixture
+def peer():
+    blockchain = Blockchain({"difficulty": 1}, clock=ManualClock(1000))
+    for i in range(6):
+        blockchain.mine_block([_tx(f"t{i}")], 1)
+    return blockchain
+
+def _with_bad_body(chain, height):
+    """Copy of chain whose block at height has a body not matching its merkle root"""
+    bad = Block.from_dict(chain[height].to_dict())
+    bad.transactions = [_tx("forged")]
+    return chain[:height] + [bad] + chain[height + 1:]
+
+def _validator(peer, checkpoints=()):
+    return Blockchain({"difficulty": 1, "assume_valid": list(checkpoints)}, clock=peer.clock)
+
+def _run(blockchain, chain):
+    checker = AssumeValidCheck(blockchain, chain)
+    ok = all(checker.check(height) for height in range(1, len(chain))) and checker.finish()
+    return ok, checker
+
+def test_bodies_below_a_matching_checkpoint_are_skipped(peer):
+    chain = peer.chain
+    blockchain = _validator(peer, [(4, chain[4].hash)])
+    ok, checker = _run(blockchain, _with_bad_body(chain, 2))
+    # Block 2's body is never looked at: the checkpoint vouches for it
+    assert ok
+    assert checker.assumed == 4 and checker.validated == 2
+
+def test_missed_checkpoint_falls_back_to_full_validation(peer):
+    chain = _with_bad_body(peer.chain, 2)
+    blockchain = _validator(peer, [(4, "0" * 64)])
+    ok, checker = _run(blockchain, chain)
+    assert not ok and checker.assumed == 0
+    ok, checker = _run(blockchain, peer.chain)
+    assert ok and checker.assumed == 0 and checker.validated == 6
+
+def test_chain_ending_below_the_checkpoint_gets_its_bodies_checked(peer):
+    blockchain = _validator(peer, [(10, "0" * 64)])
+    ok, _ = _run(blockchain, _with_bad_body(peer.chain, 3))
+    assert not ok
+    ok, checker = _run(blockchain, peer.chain)
+    assert ok and checker.validated == 6
@@ -0,0 +1,40 @@
+"""Asyncio node runtime"""
+
+import asyncio
+
+import pytest
+
+from async_runtime import AsyncNodeRuntime, LocalTipAnnouncer
+from node_framework import NodeFramework
+
+CONFIG = {
+    "difficulty": 1,
+    "num_nodes": 1,
+    "max_transactions_per_block": 2,
+    "sync_frequency_seconds": 0.05,
+    "metrics_enabled": True,
+}
+
+@pytest.fixture
+def node(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assigned = [{"sender": "alice", "receiver": "bob", "amount": 1, "tx_id": f"t{i}"} for i in range(6)]
+    return NodeFramework(0, CONFIG, transactions=assigned)
+
+def test_runtime_mines_with_the_template_builder(node):
+    runtime = AsyncNodeRuntime(node, LocalTipAnnouncer({}, 0))
+    
+    async def scenario():
+        await runtime.start()
+        assert node.template_builder.running
+        for _ in range(200):
+            if node.blockchain.snapshot.height >= 3:
+                break
+            await asyncio.sleep(0.01)
+        await runtime.stop()
+    
+    asyncio.run(scenario())
+    assert not node.template_builder.running
+    assert all(node.blockchain.snapshot.contains_tx(f"t{i}") for i in range(6))
+    # The blocks after the first were mined from prefetched templates
+    assert node.metrics.get("cache_hits_total", cache="template")
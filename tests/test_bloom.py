@@ -0,0 +1,39 @@
+"""Bloom filters for recently seen tx_ids"""
+
+from bloom import BloomFilter, RotatingBloomFilter
+
+def test_added_keys_are_always_found():
+    bloom = BloomFilter(1000)
+    keys = [f"tx_{i}" for i in range(1000)]
+    assert not any(bloom.add(key) for key in keys)
+    assert all(key in bloom for key in keys)
+    assert bloom.add("tx_7") and bloom.count == 1000
+
+def test_false_positive_rate_stays_near_the_target():
+    bloom = BloomFilter(10000, error_rate=0.01)
+    for i in range(10000):
+        bloom.add(f"tx_{i}")
+    false_positives = sum(f"other_{i}" in bloom for i in range(20000))
+    assert false_positives / 20000 < 0.02
+
+def test_bytes_and_str_keys():
+    bloom = BloomFilter(10)
+    bloom.add("abc")
+    assert b"abc" in bloom
+
+def test_rotation_keeps_the_latest_keys():
+    bloom = RotatingBloomFilter(100)
+    for i in range(250):
+        bloom.add(f"tx_{i}")
+    # At least the last `capacity` keys are remembered, the oldest are gone
+    assert all(f"tx_{i}" in bloom for i in range(150, 250))
+    assert sum(f"tx_{i}" in bloom for i in range(100)) < 5
+
+def test_seen_key_survives_rotation_while_it_keeps_coming():
+    bloom = RotatingBloomFilter(100)
+    bloom.add("hot")
+    for i in range(500):
+        bloom.add(f"tx_{i}")
+        if i % 50 == 0:
+            assert bloom.add("hot")
+    assert "hot" in bloom
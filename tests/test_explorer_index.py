@@ -0,0 +1,69 @@
+"""SQLite block explorer index"""
+
+import sqlite3
+
+import pytest
+
+from blockchain import Blockchain
+from clock import ManualClock
+from explorer_index import ExplorerIndex
+from transaction import Transaction
+
+def _tx(tx_id, receiver, amount):
+    return Transaction.from_dict({"sender": "alice", "receiver": receiver, "amount": amount, "tx_id": tx_id})
+
+@pytest.fixture
+def node():
+    node = Blockchain({"difficulty": 1}, clock=ManualClock(1000))
+    node.explorer = ExplorerIndex(":memory:")
+    node.publish_snapshot()
+    yield node
+    node.explorer.close()
+
+def _branch(node, base, blocks):
+    chain = list(base)
+    for txs in blocks:
+        block = node.prepare_block(txs, 1, chain=chain)
+        node.solve_block(block)
+        chain.append(block)
+        node.clock.advance(1)
+    return chain
+
+def test_amounts_keep_their_type(node):
+    node.mine_block([_tx("t1", "bob", 5), _tx("t2", "bob", 2.5)], 1)
+    assert node.explorer.find_transaction("t1")["amount"] == 5
+    assert isinstance(node.explorer.find_transaction("t1")["amount"], int)
+    assert node.explorer.find_transaction("t2")["amount"] == 2.5
+
+def test_reorg_removes_orphaned_transactions_from_address_history(node):
+    genesis = node.chain[:1]
+    node.chain = _branch(node, genesis, [[_tx("old_1", "bob", 1)], [_tx("old_2", "carol", 2)]])
+    assert [item["tx_id"] for item in node.explorer.address_history("alice")["items"]] == ["old_1", "old_2"]
+    node.chain = _branch(node, genesis, [[], [_tx("new_1", "carol", 3)], []])
+    assert [item["tx_id"] for item in node.explorer.address_history("alice")["items"]] == ["new_1"]
+    assert node.explorer.address_history("bob")["items"] == []
+    assert node.explorer.find_transaction("old_2") is None
+    assert node.explorer.get_block(node.chain[1].hash)["height"] == 1
+    assert node.explorer.height == 3
+
+def test_index_with_real_amounts_is_rebuilt(tmp_path):
+    path = str(tmp_path / "explorer.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        "CREATE TABLE blocks (height INTEGER PRIMARY KEY, hash TEXT NOT NULL UNIQUE, timestamp INTEGER, tx_count INTEGER);"
+        "CREATE TABLE txs (tx_id TEXT PRIMARY KEY, height INTEGER NOT NULL, position INTEGER NOT NULL,"
+        " sender TEXT, receiver TEXT, amount REAL) WITHOUT ROWID;"
+        "CREATE TABLE addresses (address TEXT NOT NULL, height INTEGER NOT NULL, position INTEGER NOT NULL,"
+        " PRIMARY KEY (address, height, position)) WITHOUT ROWID;"
+        "INSERT INTO blocks VALUES (0, 'x', 0, 0);"
+    )
+    conn.close()
+    index = ExplorerIndex(path)
+    try:
+        assert index.height == -1
+        node = Blockchain({"difficulty": 1}, clock=ManualClock(1000))
+        node.mine_block([_tx("t1", "bob", 5)], 1)
+        index.update(node.chain)
+        assert isinstance(index.find_transaction("t1")["amount"], int)
+    finally:
+        index.close()
@@ -0,0 +1,17 @@
+"""In-process network harness"""
+
+import os
+import shutil
+
+from harness import run_convergence_test
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_twenty_nodes_converge(tmp_path, monkeypatch):
+    # The harness reads config.json from the working directory
+    shutil.copy(os.path.join(REPO, "config.json"), tmp_path)
+    monkeypatch.chdir(tmp_path)
+    result = run_convergence_test(num_nodes=20, rounds=10, miners=3)
+    assert result["converged"] and result["distinct_tips"] == 1
+    assert result["chain_length"] > 1
+    assert result["wall_seconds"] < 5
@@ -0,0 +1,70 @@
+"""Streaming JSON log reader"""
+
+import json
+import random
+
+import pytest
+
+from log_reader import iter_chain_dicts, read_log_header
+
+def _log(blocks, seed=0):
+    rng = random.Random(seed)
+    chain = []
+    for i in range(blocks):
+        chain.append({
+            "index": i,
+            "hash": f"{rng.getrandbits(256):064x}",
+            "nonce": rng.randint(0, 10 ** 12),
+            "difficulty": rng.choice([1, 5, 5.5, 1e-3]),
+            "transactions": [["alice", 'b"ob]}\\n', -3.25, f"tx_{i}_{j}", None] for j in range(rng.randint(0, 3))],
+            "note": "ünïcode [brackets] {braces}, commas",
+        })
+    return {"tip": {"height": blocks - 1, "hash": "ab" * 32, "chainwork": 16 ** 40}, "chain": chain, "after": [1, 2]}
+
+def _write(path, log, indent):
+    text = json.dumps(log, indent=indent, ensure_ascii=False)
+    path.write_text(text, encoding="utf-8")
+    return text
+
+@pytest.mark.parametrize("indent", [None, 0, 2, 4])
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 65536])
+def test_matches_json_load(tmp_path, indent, chunk_size):
+    path = tmp_path / "log.json"
+    _write(path, _log(6, seed=chunk_size), indent)
+    with open(path, encoding="utf-8") as f:
+        expected = json.load(f)
+    assert list(iter_chain_dicts(str(path), chunk_size=chunk_size)) == expected["chain"]
+    assert read_log_header(str(path), chunk_size=chunk_size) == {"tip": expected["tip"]}
+
+def test_random_chunk_sizes(tmp_path):
+    rng = random.Random(42)
+    path = tmp_path / "log.json"
+    for seed in range(20):
+        log = _log(rng.randint(0, 5), seed)
+        _write(path, log, rng.choice([None, 0, 1, 3]))
+        chunk_size = rng.randint(1, 50)
+        assert list(iter_chain_dicts(str(path), chunk_size=chunk_size)) == log["chain"]
+
+def test_old_logs_without_a_header(tmp_path):
+    path = tmp_path / "log.json"
+    _write(path, {"chain": []}, 2)
+    assert list(iter_chain_dicts(str(path), chunk_size=1)) == []
+    assert read_log_header(str(path)) == {}
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 65536])
+def test_truncated_file_raises_value_error(tmp_path, chunk_size):
+    path = tmp_path / "log.json"
+    text = _write(path, _log(2), 2)
+    # Anything after the chain array is never read, so cut inside it
+    end = text.rindex("]", 0, text.index('"after"'))
+    for cut in range(text.index('"chain"'), end, 7):
+        path.write_text(text[:cut], encoding="utf-8")
+        with pytest.raises(ValueError):
+            list(iter_chain_dicts(str(path), chunk_size=chunk_size))
+
+def test_truncated_header_raises_value_error(tmp_path):
+    path = tmp_path / "log.json"
+    text = _write(path, _log(1), None)
+    path.write_text(text[:text.index('"chain"') - 10], encoding="utf-8")
+    with pytest.raises(ValueError):
+        read_log_header(str(path), chunk_size=3)
@@ -0,0 +1,68 @@
+"""Metrics of the node's caches"""
+
+import pytest
+
+from block import Block
+from blockchain import Blockchain
+from clock import ManualClock
+from metrics import Metrics
+from node_framework import NodeFramework
+from transaction import Transaction
+
+@pytest.fixture
+def node(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assigned = [{"sender": "alice", "receiver": "bob", "amount": 1, "tx_id": f"t{i}"} for i in range(3)]
+    node = NodeFramework(0, {"difficulty": 1, "num_nodes": 1, "max_transactions_per_block": 2, "metrics_enabled": True}, transactions=assigned)
+    yield node
+    node.blockchain.close()
+
+def _count(node, name, cache):
+    return node.metrics.get(name, cache=cache) or 0
+
+def test_pending_scan_resumes_while_the_chain_only_grows(node):
+    node._pending_transactions()
+    assert _count(node, "cache_misses_total", "pending_scan") == 1
+    node._pending_transactions()
+    assert _count(node, "cache_hits_total", "pending_scan") == 1
+    # A reorg back to genesis invalidates the scan position
+    node.blockchain.mine_block([], 1)
+    node._pending_transactions()
+    node.blockchain.chain = node.blockchain.chain[:1]
+    node._pending_transactions()
+    assert _count(node, "cache_misses_total", "pending_scan") == 2
+
+def test_template_built_inline_counts_as_a_miss(node):
+    assert node._next_template() is not None
+    assert _count(node, "cache_misses_total", "template") == 1
+    assert _count(node, "cache_hits_total", "template") == 0
+
+@pytest.fixture
+def peer_chain():
+    peer = Blockchain({"difficulty": 1}, clock=ManualClock(1000))
+    for i in range(6):
+        tx = Transaction.from_dict({"sender": "alice", "receiver": "bob", "amount": 1, "tx_id": f"t{i}"})
+        peer.mine_block([tx], 1)
+    return peer.chain
+
+def _syncing_node(peer_chain, checkpoints=()):
+    blockchain = Blockchain({"difficulty": 1, "assume_valid": list(checkpoints)}, clock=ManualClock(1000))
+    blockchain.metrics = Metrics()
+    blockchain.chain = [peer_chain[0]]
+    return blockchain
+
+def test_sync_counts_only_fully_validated_blocks(peer_chain):
+    blockchain = _syncing_node(peer_chain, [(4, peer_chain[4].hash)])
+    assert blockchain.sync_with_peer_chains([list(peer_chain)])
+    assert blockchain.snapshot.tip.hash == peer_chain[-1].hash
+    values = blockchain.metrics.render()
+    assert "blockchain_sync_blocks_validated_total 2" in values
+    assert "blockchain_sync_blocks_assumed_valid_total 4" in values
+
+def test_failed_block_is_not_counted_as_validated(peer_chain):
+    blockchain = _syncing_node(peer_chain)
+    bad = Block.from_dict(peer_chain[3].to_dict())
+    bad.transactions = []
+    chain = peer_chain[:3] + [bad] + peer_chain[4:]
+    assert not blockchain.sync_with_peer_chains([chain])
+    assert "blockchain_sync_blocks_validated_total 2" in blockchain.metrics.render()
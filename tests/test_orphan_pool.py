@@ -0,0 +1,113 @@
+"""Orphan pool and out-of-order block delivery"""
+
+import pytest
+
+from block import Block
+from blockchain import BranchView, Blockchain
+from clock import ManualClock
+from orphan_pool import OrphanPool
+
+def _stub(index, parent, name):
+    return Block(index=index, previous_hash=parent, merkle_root="0", nonce=0,
+                 timestamp=0, difficulty=1, transactions=[], hash_value=name)
+
+def test_pool_evicts_oldest_blocks_first():
+    pool = OrphanPool(max_blocks=2)
+    for name in ("a", "b", "c"):
+        pool.add(_stub(5, "p", name), size=10)
+    assert "a" not in pool and "b" in pool and "c" in pool
+    assert pool.bytes == 20
+
+def test_pool_byte_limit_and_expiry():
+    clock = ManualClock(0)
+    pool = OrphanPool(max_bytes=25, expiry_seconds=60, clock=clock)
+    pool.add(_stub(5, "p", "a"), size=10)
+    pool.add(_stub(5, "p", "b"), size=10)
+    clock.advance(30)
+    pool.add(_stub(5, "p", "c"), size=10)
+    assert "a" not in pool and len(pool) == 2
+    assert not pool.add(_stub(5, "p", "huge"), size=26)
+    clock.advance(31)
+    assert pool.expire() == 1
+    assert list(b.hash for b in pool.children("p")) == ["c"]
+
+def test_root_and_descendants():
+    pool = OrphanPool()
+    pool.add(_stub(5, "p", "a"), size=1)
+    pool.add(_stub(6, "a", "b"), size=1)
+    pool.add(_stub(7, "b", "c"), size=1)
+    pool.add(_stub(6, "a", "d"), size=1)
+    assert pool.root_of(pool.get("c")).hash == "a"
+    assert pool.remove_descendants("b") == 2
+    assert "a" in pool and "d" in pool and len(pool) == 2
+
+def test_branch_view_reads_through_to_the_chain():
+    chain, branch = ["g", "a", "b", "x"], ["c", "d"]
+    view = BranchView(chain, 3, branch)
+    assert len(view) == 5
+    assert [view[i] for i in range(5)] == ["g", "a", "b", "c", "d"]
+    assert view[-1] == "d" and view[1:4] == ["a", "b", "c"]
+    with pytest.raises(IndexError):
+        view[5]
+
+@pytest.fixture
+def nodes():
+    """A miner and a receiver sharing a genesis block"""
+    clock = ManualClock(1000)
+    miner = Blockchain({"difficulty": 1}, clock=clock)
+    receiver = Blockchain({"difficulty": 1}, clock=clock)
+    receiver.chain = [miner.chain[0]]
+    return miner, receiver
+
+def _mine(blockchain, count):
+    for _ in range(count):
+        blockchain.mine_block([], 1)
+    return blockchain.chain[-count:]
+
+def test_blocks_connect_in_any_order(nodes):
+    miner, receiver = nodes
+    blocks = _mine(miner, 4)
+    for block in reversed(blocks[1:]):
+        assert not receiver.receive_block(block)
+    assert len(receiver.orphans) == 3
+    assert receiver.receive_block(blocks[0])
+    assert receiver.snapshot.tip.hash == blocks[-1].hash
+    assert len(receiver.orphans) == 0
+
+def test_better_fork_is_adopted(nodes):
+    miner, receiver = nodes
+    ours = _mine(receiver, 1)
+    # A second later, so the competing block 1 differs from ours
+    miner.clock.advance(1)
+    theirs = _mine(miner, 2)
+    assert not receiver.receive_block(theirs[1])
+    assert receiver.receive_block(theirs[0])
+    assert [b.hash for b in receiver.chain[1:]] == [b.hash for b in theirs]
+    assert ours[0].hash not in [b.hash for b in receiver.chain]
+
+def test_junk_blocks_never_enter_the_pool(nodes):
+    miner, receiver = nodes
+    block = _mine(miner, 2)[1]
+    forged = Block.from_dict(block.to_dict())
+    forged.nonce += 1
+    assert not receiver.receive_block(forged)
+    wrong_hash = Block.from_dict(dict(block.to_dict(), hash="0" * 64))
+    assert not receiver.receive_block(wrong_hash)
+    assert len(receiver.orphans) == 0
+
+def test_invalid_block_is_dropped_with_its_descendants(nodes):
+    miner, receiver = nodes
+    blocks = _mine(miner, 3)
+    receiver.receive_block(blocks[2])
+    bad = Block.from_dict(blocks[1].to_dict())
+    bad.transactions = []
+    bad.merkle_root = "f" * 64
+    bad.hash = bad.calculate_hash()
+    miner.solve_block(bad)
+    receiver.receive_block(bad)
+    # Block 1 connects and the bad block 2 is dropped; block 3 waits for the real one
+    assert receiver.receive_block(blocks[0])
+    assert receiver.snapshot.height == 1
+    assert bad.hash not in receiver.orphans and blocks[2].hash in receiver.orphans
+    assert receiver.receive_block(blocks[1])
+    assert receiver.snapshot.tip.hash == blocks[2].hash
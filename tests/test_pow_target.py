@@ -0,0 +1,35 @@
+"""Compact target encoding"""
+
+import pytest
+
+from pow_target import (MAX_TARGET, bits_to_target, difficulty_to_target,
+                        target_to_bits, target_to_difficulty, target_to_work)
+
+@pytest.mark.parametrize("difficulty", [1, 2, 5, 6, 10])
+def test_whole_difficulty_matches_leading_zeros(difficulty):
+    target = difficulty_to_target(difficulty)
+    assert target == (1 << (256 - 4 * difficulty)) - 1
+    assert target_to_work(target) == 16 ** difficulty
+
+@pytest.mark.parametrize("target", [
+    1, 0x7f, 0x8000, 0x123456, difficulty_to_target(5), difficulty_to_target(5.5),
+    difficulty_to_target(0.25), MAX_TARGET,
+])
+def test_bits_round_down_and_round_trip(target):
+    bits = target_to_bits(target)
+    encoded = bits_to_target(bits)
+    # Never easier than asked for, and within the 3-byte mantissa's precision
+    assert encoded <= target
+    assert target - encoded < max(1, target >> 15)
+    assert target_to_bits(encoded) == bits
+
+def test_mantissa_never_has_the_sign_bit():
+    for target in (0x800000, 0xffffff, difficulty_to_target(5)):
+        assert not target_to_bits(target) & 0x800000
+
+def test_compact_work_is_slightly_above_whole_difficulty():
+    assert target_to_work(bits_to_target(target_to_bits(difficulty_to_target(5)))) == 1048577
+    assert target_to_work(bits_to_target(target_to_bits(difficulty_to_target(6)))) == 16777472
+
+def test_fractional_difficulty_round_trips():
+    assert target_to_difficulty(difficulty_to_target(5.5)) == pytest.approx(5.5)
@@ -0,0 +1,62 @@
+"""Pruned mode"""
+
+import pytest
+
+from blockchain import Blockchain
+from clock import ManualClock
+from transaction import Transaction
+
+def _mine(blockchain, count, tag):
+    for i in range(count):
+        tx = Transaction.from_dict({"sender": "alice", "receiver": "bob", "amount": 1, "tx_id": f"{tag}_{i}"})
+        blockchain.mine_block([tx], 1)
+
+@pytest.fixture
+def clock():
+    return ManualClock(1000)
+
+@pytest.fixture
+def pruned(clock):
+    """A node with 6 blocks whose bodies up to height 4 are pruned"""
+    node = Blockchain({"difficulty": 1, "prune_depth": 2}, clock=clock)
+    _mine(node, 6, "ours")
+    full_chain = list(node.chain)
+    assert node.prune_bodies(5) == 4
+    return node, full_chain
+
+def _peer(clock, base, count, tag):
+    peer = Blockchain({"difficulty": 1}, clock=clock)
+    peer.chain = list(base)
+    clock.advance(1)
+    _mine(peer, count, tag)
+    return peer
+
+def test_pruning_keeps_headers_and_the_tx_index(pruned):
+    node, full_chain = pruned
+    assert node.pruned_height == 4
+    assert [b.pruned for b in node.chain] == [False, True, True, True, True, False, False]
+    assert [b.hash for b in node.chain] == [b.hash for b in full_chain]
+    snapshot = node.snapshot
+    assert all(snapshot.contains_tx(f"ours_{i}") for i in range(6))
+    assert snapshot.get_balance("bob") == 6
+    assert snapshot.chainwork == node.calculate_cumulative_pow(full_chain)
+    # Nothing more to prune until the tip moves on
+    assert node.prune_bodies(6) == 0
+
+def test_longer_chain_forking_above_the_pruned_height_is_adopted(pruned, clock):
+    node, full_chain = pruned
+    peer = _peer(clock, full_chain[:6], 3, "peer")
+    assert node.sync_with_peer_chains([peer.chain])
+    assert node.snapshot.tip.hash == peer.snapshot.tip.hash
+    assert node.chain[1].pruned and node.snapshot.contains_tx("peer_2")
+
+def test_reorg_below_the_pruned_height_is_refused(pruned, clock):
+    node, full_chain = pruned
+    tip = node.snapshot.tip.hash
+    peer = _peer(clock, full_chain[:3], 8, "peer")
+    assert not node.sync_with_peer_chains([peer.chain])
+    assert node.snapshot.tip.hash == tip
+    # Pushed block by block it is refused too
+    for block in peer.chain[3:]:
+        assert not node.receive_block(block)
+    assert node.snapshot.tip.hash == tip
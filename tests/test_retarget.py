@@ -0,0 +1,105 @@
+"""Difficulty retargeting and block timestamp rules"""
+
+from block import Block
+from blockchain import Blockchain
+from clock import ManualClock
+
+RETARGET_CONFIG = {
+    "difficulty": 5,
+    "difficulty_retargeting": True,
+    "target_block_time_seconds": 10,
+    "retarget_window": 10,
+    "max_difficulty_adjustment": 1,
+    "min_difficulty": 1,
+}
+
+def _header(index, timestamp, difficulty, bits=None):
+    # Retargeting only looks at timestamps and difficulty/bits, no PoW needed
+    return Block(index=index, previous_hash="0", merkle_root="0", nonce=0,
+                 timestamp=timestamp, difficulty=difficulty, transactions=[],
+                 hash_value="0", bits=bits)
+
+def _simulate(blockchain, hash_rate, blocks, compact=False):
+    """
+    Grow a chain of headers mined at a constant hash rate: every block takes
+    exactly its expected number of hashes.
+    """
+    chain = [_header(0, 0, blockchain.base_difficulty)]
+    now = 1000.0
+    for height in range(1, blocks + 1):
+        if compact:
+            bits = blockchain.get_required_bits(chain, height)
+            block = _header(height, int(now), 0, bits)
+        else:
+            block = _header(height, int(now), blockchain.get_required_difficulty(chain, height))
+        chain.append(block)
+        now += blockchain.calculate_block_work(block) / hash_rate
+    return chain
+
+def _intervals(chain, start):
+    return [chain[i].timestamp - chain[i - 1].timestamp for i in range(start, len(chain))]
+
+def test_legacy_difficulty_changes_only_at_window_boundaries():
+    blockchain = Blockchain(RETARGET_CONFIG)
+    # 8x faster than the 10 s target at difficulty 5
+    chain = _simulate(blockchain, 8 * 16 ** 5 / 10, 60)
+    for height in range(2, len(chain)):
+        if height % 10:
+            assert chain[height].difficulty == chain[height - 1].difficulty
+
+def test_legacy_difficulty_settles_under_constant_hash_rate():
+    blockchain = Blockchain(RETARGET_CONFIG)
+    chain = _simulate(blockchain, 8 * 16 ** 5 / 10, 200)
+    # One step to 6 leading zeros (20 s blocks, the closest whole step), then it stays
+    assert {block.difficulty for block in chain[30:]} == {6}
+    assert set(_intervals(chain, 31)) == {20}
+
+def test_timestamp_before_parent_is_rejected():
+    clock = ManualClock(1000)
+    blockchain = Blockchain({"difficulty": 1}, clock=clock)
+    blockchain.mine_block([], 1)
+    clock.advance(5)
+    blockchain.mine_block([], 1)
+    block = blockchain.prepare_block([], 1)
+    block.timestamp = blockchain.chain[-1].timestamp - 1
+    blockchain.solve_block(block)
+    assert not blockchain.validate_chain_block(blockchain.chain + [block], len(blockchain.chain))
+
+def test_timestamp_far_in_the_future_is_rejected():
+    clock = ManualClock(1000)
+    blockchain = Blockchain({"difficulty": 1, "max_future_block_seconds": 60}, clock=clock)
+    block = blockchain.prepare_block([], 1)
+    block.timestamp = 1000 + 61
+    blockchain.solve_block(block)
+    assert not blockchain.validate_chain_block(blockchain.chain + [block], 1)
+    block.timestamp = 1000 + 60
+    blockchain.solve_block(block)
+    assert blockchain.validate_chain_block(blockchain.chain + [block], 1)
+
+def test_prepared_block_never_predates_its_parent():
+    clock = ManualClock(1000)
+    blockchain = Blockchain({"difficulty": 1}, clock=clock)
+    blockchain.mine_block([], 1)
+    blockchain.mine_block([], 1)
+    blockchain.chain[-1].timestamp += 30
+    assert blockchain.prepare_block([], 1).timestamp == blockchain.chain[-1].timestamp
+
+def test_compact_target_changes_only_at_window_boundaries():
+    blockchain = Blockchain(dict(RETARGET_CONFIG, compact_targets=True))
+    chain = _simulate(blockchain, 8 * 16 ** 5 / 10, 60, compact=True)
+    for height in range(2, len(chain)):
+        if height % 10:
+            assert chain[height].bits == chain[height - 1].bits
+
+def test_compact_target_converges_under_constant_hash_rate():
+    blockchain = Blockchain(dict(RETARGET_CONFIG, compact_targets=True))
+    # Miners 8x faster than the starting difficulty assumes
+    chain = _simulate(blockchain, 8 * 16 ** 5 / 10, 300, compact=True)
+    intervals = _intervals(chain, 100)
+    assert 9 <= sum(intervals) / len(intervals) <= 11
+    # No swinging between very fast and very slow blocks once settled
+    assert max(intervals) <= 12
+    # Whole-second timestamps leave a little jitter, nothing more
+    for height in range(100, len(chain), 10):
+        ratio = chain[height].target / chain[height - 1].target
+        assert 0.95 <= ratio <= 1.05
@@ -0,0 +1,65 @@
+"""Immutable chain snapshots across appends and reorgs"""
+
+import pytest
+
+from blockchain import Blockchain
+from clock import ManualClock
+from transaction import Transaction
+
+def _tx(tx_id, amount=5):
+    return Transaction.from_dict({"sender": "alice", "receiver": "bob", "amount": amount, "tx_id": tx_id})
+
+@pytest.fixture
+def blockchain():
+    return Blockchain({"difficulty": 1}, clock=ManualClock(1000))
+
+def _branch(blockchain, base, blocks):
+    """Mine a branch on top of base without touching blockchain.chain"""
+    chain = list(base)
+    for txs in blocks:
+        block = blockchain.prepare_block(txs, 1, chain=chain)
+        blockchain.solve_block(block)
+        chain.append(block)
+        blockchain.clock.advance(1)
+    return chain
+
+def test_append_leaves_older_snapshots_alone(blockchain):
+    before = blockchain.snapshot
+    blockchain.mine_block([_tx("t1")], 1)
+    after = blockchain.snapshot
+    assert after.contains_tx("t1") and not before.contains_tx("t1")
+    assert after.get_balance("bob") == 5 and before.get_balance("bob") == 0
+    assert after.chainwork == before.chainwork + blockchain.calculate_block_work(after.tip)
+
+def test_reorg_rolls_back_balances_and_work(blockchain):
+    genesis = blockchain.chain[:1]
+    blockchain.chain = _branch(blockchain, genesis, [[_tx("t1", 7)]])
+    old = blockchain.snapshot
+    blockchain.chain = _branch(blockchain, genesis, [[], [_tx("t2", 3)]])
+    new = blockchain.snapshot
+    assert not new.contains_tx("t1") and new.contains_tx("t2")
+    assert new.get_balance("bob") == 3 and old.get_balance("bob") == 7
+    assert new.chainwork == blockchain.calculate_cumulative_pow(blockchain.chain)
+
+def test_older_snapshot_still_finds_a_tx_mined_again_elsewhere(blockchain):
+    genesis = blockchain.chain[:1]
+    blockchain.chain = _branch(blockchain, genesis, [[_tx("t1")]])
+    old = blockchain.snapshot
+    # The reorg mines t1 again, one block higher
+    blockchain.chain = _branch(blockchain, genesis, [[], [_tx("t1")]])
+    new = blockchain.snapshot
+    assert new.tx_location("t1") == (2, new.chain[2].hash)
+    assert old.tx_location("t1") == (1, old.chain[1].hash)
+    # And back again: both snapshots keep answering for their own chain
+    blockchain.chain = list(old.chain)
+    assert blockchain.snapshot.contains_tx("t1")
+    assert new.tx_location("t1") == (2, new.chain[2].hash)
+
+def test_saved_tx_index_holds_only_the_current_chain(blockchain, tmp_path):
+    genesis = blockchain.chain[:1]
+    blockchain.chain = _branch(blockchain, genesis, [[_tx("t1")], [_tx("t2")]])
+    blockchain.chain = _branch(blockchain, genesis, [[], [_tx("t1")], []])
+    path = tmp_path / "state.json"
+    blockchain.save_state(str(path))
+    state = blockchain.load_state(str(path))
+    assert state["tx_index"] == {"t1": [2, blockchain.chain[2].hash]}
@@ -0,0 +1,53 @@
+"""Restarting a node from its state snapshot"""
+
+import pytest
+
+from node_framework import NodeFramework
+from transaction import Transaction
+
+CONFIG = {"difficulty": 1, "num_nodes": 1, "state_snapshot_interval": 1}
+
+def _tx(tx_id):
+    return {"sender": "alice", "receiver": "bob", "amount": 1, "tx_id": tx_id}
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+def _restart(assigned):
+    node = NodeFramework(0, CONFIG, transactions=assigned)
+    node.blockchain.close()
+    return node
+
+def test_restart_replays_only_from_the_snapshot(workdir):
+    assigned = [_tx("a1"), _tx("a2")]
+    node = _restart(assigned)
+    node.blockchain.mine_block([Transaction.from_dict(assigned[0])], 1)
+    with node.chain_lock:
+        node._save_state(force=True)
+    node._save_blockchain()
+    
+    restarted = _restart(assigned)
+    assert restarted._state_height == 1
+    assert restarted.blockchain.snapshot.tip.hash == node.blockchain.snapshot.tip.hash
+    assert restarted.blockchain.snapshot.contains_tx("a1")
+    assert [tx["tx_id"] for tx in restarted._pending_transactions()] == ["a2"]
+
+def test_transactions_mined_before_the_snapshot_survive_a_later_reorg(workdir):
+    assigned = [_tx("a1"), _tx("a2")]
+    node = _restart(assigned)
+    node.submit_transactions([_tx("s1"), _tx("s2")])
+    node.blockchain.mine_block([Transaction.from_dict(tx) for tx in (_tx("a1"), _tx("s1"))], 1)
+    with node.chain_lock:
+        node._save_state(force=True)
+    node._save_blockchain()
+    
+    restarted = _restart(assigned)
+    assert [tx["tx_id"] for tx in restarted._pending_transactions()] == ["a2", "s2"]
+    # Submitted transactions aren't handed over twice after the restart
+    assert restarted.submit_transactions([_tx("s1")])["accepted"] == 0
+    
+    # A reorg unmines the block: everything in it is pending again
+    restarted.blockchain.chain = restarted.blockchain.chain[:1]
+    assert [tx["tx_id"] for tx in restarted._pending_transactions()] == ["a1", "a2", "s1", "s2"]
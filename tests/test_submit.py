@@ -0,0 +1,30 @@
+"""Batch transaction submission"""
+
+import pytest
+
+from node_framework import NodeFramework
+
+@pytest.fixture
+def node(tmp_path, monkeypatch):
+    # Node files (log, state, inbox) are written to the working directory
+    monkeypatch.chdir(tmp_path)
+    node = NodeFramework(0, {"difficulty": 1, "num_nodes": 1}, transactions=[])
+    yield node
+    node.blockchain.close()
+
+def _tx(tx_id, amount=5):
+    return {"sender": "alice", "receiver": "bob", "amount": amount, "tx_id": tx_id}
+
+def test_valid_transactions_are_queued_once(node):
+    assert node.submit_transactions([_tx("t1"), _tx("t2")]) == {"accepted": 2, "duplicate": 0, "invalid": 0}
+    assert node.submit_transactions([_tx("t1")]) == {"accepted": 0, "duplicate": 1, "invalid": 0}
+    assert [tx["tx_id"] for tx in node.submitted_transactions] == ["t1", "t2"]
+
+def test_invalid_copy_does_not_censor_the_valid_one(node):
+    assert node.submit_transactions([_tx("t1", amount=-5)]) == {"accepted": 0, "duplicate": 0, "invalid": 1}
+    assert node.submit_transactions([_tx("t1")]) == {"accepted": 1, "duplicate": 0, "invalid": 0}
+    assert [tx["tx_id"] for tx in node.submitted_transactions] == ["t1"]
+
+def test_invalid_copy_in_the_same_batch_does_not_censor_the_valid_one(node):
+    counts = node.submit_transactions([_tx("t1", amount=-5), _tx("t1"), _tx("t1")])
+    assert counts == {"accepted": 1, "duplicate": 1, "invalid": 1}
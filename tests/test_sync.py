@@ -0,0 +1,79 @@
+"""Claim-ordered sync and remembering failed peers"""
+
+import json
+
+import pytest
+
+from blockchain import Blockchain
+from clock import ManualClock
+from metrics import Metrics
+
+@pytest.fixture
+def clock():
+    return ManualClock(1000)
+
+@pytest.fixture
+def node(clock):
+    node = Blockchain({"difficulty": 1}, clock=clock)
+    node.metrics = Metrics()
+    return node
+
+def _peer(node, clock, blocks):
+    """A peer on node's genesis with its own chain of `blocks` blocks"""
+    peer = Blockchain({"difficulty": 1}, clock=clock)
+    peer.chain = node.chain[:1]
+    clock.advance(1)
+    for _ in range(blocks):
+        peer.mine_block([], 1)
+    return peer
+
+def _overclaim(path):
+    with open(path) as f:
+        log = json.load(f)
+    log["tip"]["chainwork"] += 1000
+    with open(path, "w") as f:
+        json.dump(log, f)
+
+def _count(node, name):
+    return node.metrics.get(name) or 0
+
+def test_best_claim_is_validated_first_and_weaker_peers_are_skipped(node, clock, tmp_path):
+    strong, weak = _peer(node, clock, 5), _peer(node, clock, 3)
+    strong.save_to_file(str(tmp_path / "strong.json"))
+    weak.save_to_file(str(tmp_path / "weak.json"))
+    assert node.sync_with_peer_logs([str(tmp_path / "weak.json"), str(tmp_path / "strong.json")])
+    assert node.snapshot.tip.hash == strong.snapshot.tip.hash
+    # The weak log's claim can't win, so its blocks are never parsed
+    assert _count(node, "sync_blocks_parsed_total") == 6
+
+def test_overclaiming_log_is_rejected_and_remembered(node, clock, tmp_path):
+    path = str(tmp_path / "liar.json")
+    _peer(node, clock, 3).save_to_file(path)
+    _overclaim(path)
+    genesis = node.snapshot.tip.hash
+    assert not node.sync_with_peer_logs([path])
+    assert node.snapshot.tip.hash == genesis
+    assert path in node.failed_peers
+    assert _count(node, "sync_peers_rejected_total") == 1
+
+def test_unchanged_failed_log_is_skipped(node, clock, tmp_path):
+    path = str(tmp_path / "liar.json")
+    _peer(node, clock, 3).save_to_file(path)
+    _overclaim(path)
+    node.sync_with_peer_logs([path])
+    parsed = _count(node, "sync_blocks_parsed_total")
+    assert not node.sync_with_peer_logs([path])
+    assert _count(node, "sync_blocks_parsed_total") == parsed
+    assert _count(node, "sync_peers_skipped_total") == 1
+
+def test_changed_log_is_checked_again(node, clock, tmp_path):
+    path = str(tmp_path / "peer.json")
+    peer = _peer(node, clock, 3)
+    peer.save_to_file(path)
+    _overclaim(path)
+    assert not node.sync_with_peer_logs([path])
+    # The peer moves on and writes an honest log
+    peer.mine_block([], 1)
+    peer.save_to_file(path)
+    assert node.sync_with_peer_logs([path])
+    assert node.snapshot.tip.hash == peer.snapshot.tip.hash
@@ -0,0 +1,70 @@
+"""Sync validation in worker processes"""
+
+import json
+
+import pytest
+
+from blockchain import Blockchain
+from clock import ManualClock
+from transaction import Transaction
+
+def _mine(blockchain, count, tag):
+    for i in range(count):
+        tx = Transaction.from_dict({"sender": "alice", "receiver": "bob", "amount": 1, "tx_id": f"{tag}_{i}"})
+        blockchain.mine_block([tx], 1)
+
+@pytest.fixture
+def network(tmp_path):
+    """Our chain of 3 blocks, and peer logs that fork from it at height 2"""
+    clock = ManualClock(1000)
+    ours = Blockchain({"difficulty": 1}, clock=clock)
+    _mine(ours, 3, "ours")
+    logs = {}
+    for name, length in (("good", 4), ("short", 2), ("bad", 5)):
+        peer = Blockchain({"difficulty": 1}, clock=clock)
+        peer.chain = ours.chain[:3]
+        _mine(peer, length, name)
+        logs[name] = str(tmp_path / f"{name}.json")
+        peer.save_to_file(logs[name])
+    # Break the bad peer above the fork; its claim still outranks everyone
+    with open(logs["bad"]) as f:
+        log = json.load(f)
+    log["chain"][4]["merkle_root"] = "0" * 64
+    with open(logs["bad"], "w") as f:
+        json.dump(log, f)
+    return ours.chain, logs
+
+def _node(chain, workers):
+    node = Blockchain({"difficulty": 1, "sync_validation_workers": workers}, clock=ManualClock(1000))
+    node.chain = list(chain)
+    return node
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_pool_and_serial_sync_pick_the_same_chain(network, workers):
+    chain, logs = network
+    node = _node(chain, workers)
+    try:
+        assert node.sync_with_peer_logs([logs["short"], logs["bad"], logs["good"]])
+        if workers:
+            assert node._validation_pool is not None
+        with open(logs["good"]) as f:
+            assert node.snapshot.tip.hash == json.load(f)["tip"]["hash"]
+        assert logs["bad"] in node.failed_peers
+    finally:
+        node.close()
+
+def test_invalid_peer_is_rejected_by_the_pool_without_touching_our_chain(network, tmp_path):
+    chain, logs = network
+    copy = str(tmp_path / "bad_copy.json")
+    with open(logs["bad"]) as src, open(copy, "w") as dst:
+        dst.write(src.read())
+    node = _node(chain, 2)
+    try:
+        before = node.snapshot
+        assert not node.sync_with_peer_logs([logs["bad"], copy])
+        assert node._validation_pool is not None
+        assert node.snapshot is before
+        assert [b.hash for b in node.chain] == [b.hash for b in chain]
+        assert logs["bad"] in node.failed_peers and copy in node.failed_peers
+    finally:
+        node.close()
@@ -0,0 +1,257 @@
+"""
+Block Lifecycle Tracing
+
+Every node can record what happens to each block it deals with, one JSON
+event per line in node_<id>_trace.ndjson:
+
+    mined      this node found the block
+    persisted  this node published its chain with the block in it
+    seen       first time the block arrived from a peer (parsed)
+    validated  the block passed validation here
+    adopted    the block became part of this node's chain through sync
+    orphaned   a reorg dropped the block from this node's chain (with the depth)
+
+Each event has the node id, wall-clock time "t", block hash and height.
+
+Running this module merges the traces of all nodes and reports how long
+blocks took from one stage to the next (mined -> persisted -> seen ->
+validated -> adopted, showing whether time goes into sync polling,
+parsing or validation), how long until every node had a block, fork and
+orphan rates, and reorg depths.
+
+Usage:
+    python tracing.py [--output trace_report.json]
+"""
+
+import argparse
+import json
+import math
+import threading
+from collections import OrderedDict, defaultdict
+from clock import SYSTEM_CLOCK
+
+EVENTS = ("mined", "persisted", "seen", "validated", "adopted", "orphaned")
+
+# Block hashes remembered per event type for "first time only" events
+SEEN_CACHE_SIZE = 10000
+
+class Tracer:
+    """
+    Appends block lifecycle events to a node's trace file.
+
+    A disabled Tracer returns immediately from every call, like a disabled
+    Metrics object.
+    """
+
+    def __init__(self, path=None, node_id=None, clock=None, enabled=True):
+        """
+        Args:
+            path: Trace file (NDJSON, appended to)
+            node_id: Node recording the events
+            clock: Time source for the timestamps (defaults to wall-clock)
+            enabled: False turns every call into a no-op
+        """
+        self.enabled = enabled and path is not None
+        self.path = path
+        self.node_id = node_id
+        self.clock = clock or SYSTEM_CLOCK
+        self._lock = threading.Lock()
+        self._file = None
+        # event -> recently traced hashes, for events recorded once per block
+        self._once = defaultdict(OrderedDict)
+
+    def event(self, name, block, t=None, once=False, **fields):
+        """
+        Record one event for a block.
+
+        Args:
+            name: One of EVENTS
+            block: The Block
+            t: Timestamp (defaults to now; pass one to give several events the same time)
+            once: Only record the first such event for this block
+            fields: Extra fields to store
+        """
+        if not self.enabled:
+            return
+        record = {"event": name, "node": self.node_id, "t": self.clock.time() if t is None else t,
+                  "block": block.hash, "height": block.index}
+        record.update(fields)
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            if once:
+                seen = self._once[name]
+                if block.hash in seen:
+                    return
+                seen[block.hash] = True
+                if len(seen) > SEEN_CACHE_SIZE:
+                    seen.popitem(last=False)
+            if self._file is None:
+                self._file = open(self.path, "a")
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+NULL_TRACER = Tracer(enabled=False)
+
+def load_traces(paths):
+    """
+    Read the events of several trace files.
+
+    Returns:
+        List of event dictionaries (unreadable lines are skipped)
+    """
+    events = []
+    for path in paths:
+        try:
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        events.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except OSError:
+            continue
+    return events
+
+def distribution(values):
+    """count / mean / p50 / p95 / p99 / max of a list of numbers"""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def rank(fraction):
+        return round(ordered[max(0, math.ceil(fraction * len(ordered)) - 1)], 4)
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 4),
+        "p50": rank(0.50),
+        "p95": rank(0.95),
+        "p99": rank(0.99),
+        "max": round(ordered[-1], 4),
+    }
+
+def analyze(events, num_nodes, final_chain=None):
+    """
+    Turn raw events into propagation, fork and convergence statistics.
+
+    Args:
+        events: Events from load_traces
+        num_nodes: Nodes in the network (for "all nodes agree")
+        final_chain: Set of block hashes on the final consensus chain, if
+                     known (orphans are then counted against it)
+
+    Returns:
+        Report dictionary
+    """
+    # hash -> (miner, time mined, height)
+    mined = {}
+    # (hash, node) -> first time of each event
+    first = defaultdict(dict)
+    orphan_events = []
+    for e in events:
+        key = (e["block"], e["node"])
+        if e["event"] == "mined":
+            mined[e["block"]] = (e["node"], e["t"], e["height"])
+        elif e["event"] == "orphaned":
+            orphan_events.append(e)
+        if e["event"] not in first[key] or e["t"] < first[key][e["event"]]:
+            first[key][e["event"]] = e["t"]
+
+    stages = {"mined_to_persisted": [], "persisted_to_seen": [], "seen_to_validated": [],
+              "validated_to_adopted": [], "mined_to_seen": [], "mined_to_adopted": []}
+    all_nodes_have = []
+    for block_hash, (miner, t_mined, _) in mined.items():
+        persisted = first[(block_hash, miner)].get("persisted")
+        if persisted is not None:
+            stages["mined_to_persisted"].append(persisted - t_mined)
+        reached = 1
+        latest = t_mined
+        for node in range(num_nodes):
+            if node == miner:
+                continue
+            times = first.get((block_hash, node), {})
+            seen, validated, adopted = times.get("seen"), times.get("validated"), times.get("adopted")
+            if seen is not None:
+                stages["mined_to_seen"].append(seen - t_mined)
+                if persisted is not None:
+                    stages["persisted_to_seen"].append(seen - persisted)
+                if validated is not None:
+                    stages["seen_to_validated"].append(validated - seen)
+            if adopted is not None:
+                stages["mined_to_adopted"].append(adopted - t_mined)
+                if validated is not None:
+                    stages["validated_to_adopted"].append(adopted - validated)
+                reached += 1
+                latest = max(latest, adopted)
+        if reached == num_nodes:
+            all_nodes_have.append(latest - t_mined)
+
+    # A fork: more than one block mined at the same height
+    heights = defaultdict(set)
+    for block_hash, (_, _, height) in mined.items():
+        heights[height].add(block_hash)
+    fork_heights = sum(1 for hashes in heights.values() if len(hashes) > 1)
+
+    if final_chain is not None:
+        orphans = [h for h in mined if h not in final_chain]
+    else:
+        orphans = list({e["block"] for e in orphan_events if e["block"] in mined})
+
+    # One reorg per (node, time): all blocks dropped by it share the timestamp
+    reorgs = {}
+    for e in orphan_events:
+        reorgs[(e["node"], e["t"])] = e.get("reorg_depth", 1)
+
+    return {
+        "nodes": num_nodes,
+        "blocks_mined": len(mined),
+        "heights": len(heights),
+        "fork_rate": round(fork_heights / len(heights), 4) if heights else 0.0,
+        "orphan_rate": round(len(orphans) / len(mined), 4) if mined else 0.0,
+        "reorgs": len(reorgs),
+        "reorg_depth": distribution(list(reorgs.values())),
+        "propagation": {name: distribution(values) for name, values in stages.items()},
+        # Time from mining a block until every node had adopted it
+        "all_nodes_agree": distribution(all_nodes_have),
+    }
+
+def main(argv=None):
+    from config import load_config, get_node_trace_file, get_node_log_file
+    from log_reader import iter_chain_dicts, read_log_header
+
+    parser = argparse.ArgumentParser(description="Report block propagation and forks from node traces")
+    parser.add_argument("--output", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    config = load_config()
+    num_nodes = config["num_nodes"]
+    events = load_traces([get_node_trace_file(i) for i in range(num_nodes)])
+
+    # The final consensus chain: the node log with the most work
+    final_chain = None
+    best = None
+    for i in range(num_nodes):
+        try:
+            tip = read_log_header(get_node_log_file(i)).get("tip")
+        except (OSError, ValueError):
+            continue
+        if tip and (best is None or (-tip["chainwork"], tip["hash"]) < best[0]):
+            best = ((-tip["chainwork"], tip["hash"]), get_node_log_file(i))
+    if best is not None:
+        final_chain = {block["hash"] for block in iter_chain_dicts(best[1])}
+
+    report = analyze(events, num_nodes, final_chain)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
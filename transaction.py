@@ -6,7 +6,14 @@ Students implement the TODO sections.
 """
 
 import json
-from crypto_utils import hash_data,verify_signature
+import math
+from crypto_utils import hash_data,verify_signature, public_key_from_string
+
+# Senders that are real public keys (the simulation's addresses are plain strings)
+PUBLIC_KEY_PREFIX = "-----BEGIN PUBLIC KEY"
+
+# Parsed sender keys kept by check_transactions (cleared when full)
+MAX_CACHED_KEYS = 10000
 
 class Transaction:
     """
@@ -121,3 +128,84 @@ class Transaction:
 
         return verify_signature(transn_hash,self.signature,public_key)
         
+
+
+def check_transaction_format(tx_dict):
+    """
+    Cheap structural checks of a submitted transaction dictionary.
+    
+    Args:
+        tx_dict: Transaction dictionary as submitted
+        
+    Returns:
+        None if it is well-formed, otherwise the reason it isn't
+    """
+    if not isinstance(tx_dict, dict):
+        return "not an object"
+    tx_id = tx_dict.get("tx_id")
+    if not isinstance(tx_id, str) or not tx_id:
+        return "missing tx_id"
+    for field in ("sender", "receiver"):
+        value = tx_dict.get(field)
+        if not isinstance(value, str) or not value:
+            return f"missing {field}"
+    amount = tx_dict.get("amount")
+    if isinstance(amount, bool) or not isinstance(amount, (int, float)) or not math.isfinite(amount) or amount <= 0:
+        return "amount must be a positive number"
+    signature = tx_dict.get("signature")
+    if signature is not None and not isinstance(signature, str):
+        return "signature must be a hex string"
+    if "hash" in tx_dict and not isinstance(tx_dict["hash"], str):
+        return "hash must be a hex string"
+    return None
+
+def check_transactions(tx_dicts, key_cache=None):
+    """
+    Check a batch of submitted transactions: format, then hash, then signature.
+    
+    The hash is only compared when the dictionary carries one ("hash").
+    Transactions from a public-key sender must be signed by that key;
+    transactions between the simulation's plain addresses are signed by the
+    miner later, so a signature on them can't be checked and isn't required.
+    
+    Args:
+        tx_dicts: List of transaction dictionaries
+        key_cache: Dictionary sender -> parsed public key, reused across
+                   calls so each sender's PEM is parsed once
+        
+    Returns:
+        List of the transaction dictionaries that passed, in input order
+    """
+    if key_cache is None:
+        key_cache = {}
+    valid = []
+    for tx_dict in tx_dicts:
+        if check_transaction_format(tx_dict) is not None:
+            continue
+        sender = tx_dict["sender"]
+        signed_by_key = sender.startswith(PUBLIC_KEY_PREFIX)
+        if "hash" not in tx_dict and not signed_by_key:
+            # Nothing more to check without building the Transaction
+            valid.append(tx_dict)
+            continue
+        tx = Transaction.from_dict(tx_dict)
+        tx_hash = tx.calculate_hash()
+        if "hash" in tx_dict and tx_dict["hash"] != tx_hash:
+            continue
+        if signed_by_key:
+            if not isinstance(tx.signature, bytes):
+                continue
+            public_key = key_cache.get(sender)
+            if public_key is None:
+                try:
+                    public_key = public_key_from_string(sender)
+                except Exception:
+                    # Not a key we can load (malformed PEM, unsupported algorithm)
+                    continue
+                if len(key_cache) >= MAX_CACHED_KEYS:
+                    key_cache.clear()
+                key_cache[sender] = public_key
+            if not verify_signature(tx_hash, tx.signature, public_key):
+                continue
+        valid.append(tx_dict)
+    return valid
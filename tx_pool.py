@@ -0,0 +1,171 @@
+"""
+Transaction Pool Reader
+
+This module reads the transaction pool written by generate_transactions.py.
+Two layouts are supported:
+
+- Streaming pool (a directory, default transaction_pool/):
+    manifest.json        pool size, addresses, node -> permutation assignment
+    transactions.ndjson  one transaction dict per line, in tx_id order
+    transactions.offsets uint64 byte offset of every line
+    perm_<k>.u32         permutation k as an array of uint32 line indices
+    shard_<k>.offsets    uint64 byte offsets of the lines in permutation k's order
+- Legacy pool: one transaction_pool.json holding every permutation and
+  every node's full transaction list.
+
+A node only opens its own shard and the NDJSON file, both memory-mapped,
+and decodes a transaction when it is first needed (ShardedTransactions), so
+node startup doesn't depend on the pool's permutation or node count.
+"""
+
+import json
+import mmap
+import os
+import sys
+from array import array
+
+DEFAULT_POOL_DIR = "transaction_pool"
+LEGACY_POOL_FILE = "transaction_pool.json"
+MANIFEST_FILE = "manifest.json"
+TRANSACTIONS_FILE = "transactions.ndjson"
+OFFSETS_FILE = "transactions.offsets"
+
+# uint32 line indices (4 bytes per transaction per permutation)
+INDEX_TYPECODE = "I"
+# uint64 byte offsets into the NDJSON file
+OFFSET_TYPECODE = "Q"
+
+def get_pool_dir(config=None):
+    """Directory of the streaming pool"""
+    return (config or {}).get("transaction_pool_dir", DEFAULT_POOL_DIR)
+
+def permutation_file(perm_id):
+    """File name of a permutation index array"""
+    return f"perm_{perm_id}.u32"
+
+def shard_file(perm_id):
+    """File name of a permutation's offset shard"""
+    return f"shard_{perm_id}.offsets"
+
+def _map_file(path):
+    """Read-only memory map of a file (None for an empty file, which can't be mapped)"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+class ShardedTransactions:
+    """
+    A node's assigned transactions, read lazily from its shard.
+    
+    Behaves like a read-only list of transaction dicts: len(), indexing and
+    iteration. Both files are memory-mapped and a line is only decoded when
+    it is accessed, so opening costs the same for any pool size.
+    """
+    
+    def __init__(self, pool_dir, manifest, perm_id):
+        """
+        Args:
+            pool_dir: Directory of the streaming pool
+            manifest: Pool manifest (see load_manifest)
+            perm_id: Permutation (shard) assigned to the node
+        """
+        self._data = _map_file(os.path.join(pool_dir, manifest["transactions_file"]))
+        self._shard = _map_file(os.path.join(pool_dir, manifest["shards"][perm_id]))
+        typecode = manifest.get("offset_typecode", OFFSET_TYPECODE)
+        if self._shard is None:
+            self._offsets = array(typecode)
+        elif manifest.get("byteorder", sys.byteorder) != sys.byteorder:
+            # Foreign byte order: fall back to a swapped in-memory copy
+            self._offsets = array(typecode, self._shard[:])
+            self._offsets.byteswap()
+        else:
+            self._offsets = memoryview(self._shard).cast(typecode)
+    
+    def __len__(self):
+        return len(self._offsets)
+    
+    def _decode(self, offset):
+        end = self._data.find(b"\n", offset)
+        if end < 0:
+            end = len(self._data)
+        return json.loads(self._data[offset:end])
+    
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._decode(offset) for offset in self._offsets[i]]
+        return self._decode(self._offsets[i])
+    
+    def __iter__(self):
+        for offset in self._offsets:
+            yield self._decode(offset)
+
+def load_manifest(pool_dir):
+    """
+    Read the manifest of a streaming pool.
+
+    Returns:
+        Manifest dictionary, or None if there is no streaming pool
+    """
+    path = os.path.join(pool_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+def pool_exists(config=None):
+    """True if a streaming or legacy pool has been generated"""
+    return load_manifest(get_pool_dir(config)) is not None or os.path.exists(LEGACY_POOL_FILE)
+
+def read_permutation(pool_dir, manifest, perm_id):
+    """
+    Load one permutation as an array of transaction line indices.
+
+    Returns:
+        array of uint32 indices into the transactions file
+    """
+    order = array(manifest.get("index_typecode", INDEX_TYPECODE))
+    path = os.path.join(pool_dir, manifest["permutations"][perm_id])
+    with open(path, "rb") as f:
+        order.frombytes(f.read())
+    if manifest.get("byteorder", sys.byteorder) != sys.byteorder:
+        order.byteswap()
+    return order
+
+def iter_pool_transactions(pool_dir, manifest):
+    """Yield every transaction dict of a streaming pool in tx_id order"""
+    with open(os.path.join(pool_dir, manifest["transactions_file"]), "rb") as f:
+        for line in f:
+            yield json.loads(line)
+
+def load_node_transactions(node_id, config=None):
+    """
+    Load the transactions assigned to a node, in its permutation's order.
+
+    Uses the streaming pool if one exists (lazily through its shard, if the
+    pool has shards), otherwise transaction_pool.json.
+
+    Returns:
+        ShardedTransactions or list of transaction dictionaries (empty if
+        the node has no assignment)
+    """
+    pool_dir = get_pool_dir(config)
+    manifest = load_manifest(pool_dir)
+    node_key = f"node_{node_id}"
+
+    if manifest is None:
+        with open(LEGACY_POOL_FILE, "r") as f:
+            pool_data = json.load(f)
+        if node_key in pool_data["node_assignments"]:
+            return pool_data["node_assignments"][node_key]["transactions"]
+        return []
+
+    perm_id = manifest["node_assignments"].get(node_key)
+    if perm_id is None:
+        return []
+    if manifest.get("shards"):
+        return ShardedTransactions(pool_dir, manifest, perm_id)
+    order = read_permutation(pool_dir, manifest, perm_id)
+    with open(os.path.join(pool_dir, manifest["transactions_file"]), "rb") as f:
+        lines = f.readlines()
+    return [json.loads(lines[i]) for i in order]